@@ -0,0 +1,68 @@
+"""
+시작(import) 시간 회귀 벤치마크 (python -X importtime)
+
+    python benchmarks/bench_import_time.py
+
+한 번 실행하고 끝나는 봇(cse/dorm/library/with)을 새 파이썬 프로세스에서 import만 해보고
+- 전체 import 시간 (RUNS번 중 중간값)
+- 가장 오래 걸린 모듈 TOP_N개
+- 실제로 쓰기 전에는 불러오면 안 되는 무거운 모듈(LAZY_MODULES)이 import 됐는지
+를 출력함. 무거운 모듈이 시작할 때 다시 불러와지면 종료 코드 1 (CI에서 회귀 확인용)
+"""
+import os
+import sys
+import subprocess
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+BOTS = ["cse_bot", "dorm_bot", "library_bot", "with_bot"]
+RUNS = 5
+TOP_N = 5
+# 세션/헤더/브라우저가 처음 필요할 때 import 되어야 하는 모듈
+LAZY_MODULES = [
+    "requests", "urllib3", "curl_cffi", "fake_useragent", "dotenv",
+    "selenium", "webdriver_manager", "asyncio",
+]
+
+
+def import_times(module):
+    """새 프로세스에서 import -> {모듈 이름: 누적 시간(us)}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line: continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # 머리글 줄
+    return times
+
+
+def measure(module):
+    """RUNS번 측정 -> (전체 ms 중간값, 마지막 측정 결과)"""
+    totals = []
+    for _ in range(RUNS):
+        times = import_times(module)
+        totals.append(times.get(module, 0) / 1000)
+    return sorted(totals)[len(totals) // 2], times
+
+
+# ===[MAIN]===
+if __name__ == "__main__":
+    failed = False
+    print(f"{'봇':<14}{'import(ms)':>12}  가장 무거운 모듈")
+    for bot in BOTS:
+        total, times = measure(bot)
+        heaviest = sorted(((t, name) for name, t in times.items() if name != bot), reverse=True)[:TOP_N]
+        print(f"{bot:<14}{total:>12.1f}  " + ", ".join(f"{name} {t / 1000:.1f}" for t, name in heaviest))
+
+        loaded = sorted({name.split(".")[0] for name in times} & set(LAZY_MODULES))
+        if loaded:
+            failed = True
+            print(f"{'':<14}{'':>12}  ⚠ 시작할 때 불러옴: {', '.join(loaded)}")
+
+    sys.exit(1 if failed else 0)
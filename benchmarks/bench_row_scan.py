@@ -0,0 +1,94 @@
+"""
+게시판 줄 스캔 벤치마크 (전체 스캔 vs 이미 본 글에서 중단)
+
+    python benchmarks/bench_row_scan.py
+
+학과(cse) 게시판 모양의 30줄 / 300줄 가짜 페이지를 만들고
+새 글 2건이 있는 상황에서 파서 백엔드별로 걸리는 시간을 비교함
+"""
+import os
+import sys
+import timeit
+import importlib
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import board_parser
+import seen_ids
+import cse_bot
+
+URL = "https://computer.cnu.ac.kr/computer/notice/bachelor.do?articleLimit=30"
+PINNED = 3
+NEW_POSTS = 2
+REPEAT = 50
+
+
+# ===[가짜 페이지]===
+def make_page(row_count):
+    """고정글 PINNED개 + 최신순 일반글, 위쪽 NEW_POSTS개만 빼고 전부 본 글로 기록"""
+    top_id = 600000
+    rows = []
+    for i in range(PINNED):
+        rows.append(
+            f'<tr class="b-top-box"><td class="b-num-box">공지</td>'
+            f'<td class="b-td-left"><div class="b-title-box">'
+            f'<a href="?mode=view&amp;articleNo={top_id - 5000 - i}" title="고정 공지 {i} 자세히 보기">고정 공지 {i}</a>'
+            f'</div></td><td>학과사무실</td><td>2025.03.0{i + 1}</td><td>{100 + i}</td></tr>'
+        )
+    for i in range(row_count - PINNED):
+        rows.append(
+            f'<tr><td class="b-num-box">{row_count - i}</td>'
+            f'<td class="b-td-left"><div class="b-title-box">'
+            f'<a href="?mode=view&amp;articleNo={top_id - i}" title="일반 공지 {i} 자세히 보기">일반 공지 {i}</a>'
+            f'</div></td><td>학과사무실</td><td>2025.02.{i % 28 + 1:02d}</td><td>{i * 3}</td></tr>'
+        )
+    html = (
+        '<html><head><title>학사공지</title></head><body><div class="header">메뉴</div>'
+        '<table class="board-table"><thead><tr><th>번호</th><th>제목</th></tr></thead>'
+        f'<tbody>{"".join(rows)}</tbody></table><div class="footer">푸터</div></body></html>'
+    )
+    seen = seen_ids.empty()
+    for i in range(PINNED):
+        seen_ids.add(seen, top_id - 5000 - i)
+    for i in range(NEW_POSTS, row_count - PINNED):
+        seen_ids.add(seen, top_id - i)
+    return html.encode("utf-8"), seen
+
+
+# ===[측정 대상]===
+def full_scan(content, seen):
+    """기존 방식: 모든 줄을 파싱하고 비교"""
+    found = []
+    for row in board_parser.iter_rows(content):
+        notice = cse_bot.parse_row(row, URL)
+        if notice and not seen_ids.contains(seen, notice["id"]):
+            found.append(notice)
+    return found
+
+
+def early_exit(content, seen):
+    """새 방식: 이미 본 일반글이 이어지면 중단"""
+    rows = board_parser.iter_rows(content)
+    return board_parser.scan_new(rows, lambda row: cse_bot.parse_row(row, URL), seen)[0]
+
+
+def use_backend(name):
+    os.environ["BOARD_PARSER"] = name
+    importlib.reload(board_parser)
+    return board_parser.BACKEND == name
+
+
+# ===[MAIN]===
+if __name__ == "__main__":
+    pages = {n: make_page(n) for n in (30, 300)}
+
+    print(f"{'백엔드':<12}{'줄 수':>6}{'전체 스캔(ms)':>16}{'중단 스캔(ms)':>16}{'배수':>8}")
+    for backend in ("lxml", "selectolax", "bs4"):
+        if not use_backend(backend):
+            print(f"{backend:<12} (설치 안 됨 - 건너뜀)")
+            continue
+        for n, (content, seen) in pages.items():
+            assert len(full_scan(content, seen)) == len(early_exit(content, seen)) == NEW_POSTS
+            full = timeit.timeit(lambda: full_scan(content, seen), number=REPEAT) / REPEAT * 1000
+            early = timeit.timeit(lambda: early_exit(content, seen), number=REPEAT) / REPEAT * 1000
+            print(f"{backend:<12}{n:>6}{full:>16.3f}{early:>16.3f}{full / early:>8.1f}x")
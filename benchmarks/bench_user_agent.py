@@ -0,0 +1,84 @@
+"""
+헤더 생성 벤치마크 (요청마다 UserAgent() 생성 vs header_profile)
+
+    python benchmarks/bench_user_agent.py
+
+import 비용은 새 파이썬 프로세스에서 측정 (이미 불러온 모듈 캐시 영향 없음)
+봇이 어차피 불러오는 http_client(requests/curl_cffi)는 양쪽 모두 미리 import 해두고 차이만 잼
+- 기존: 모듈 import 때 fake_useragent도 같이 import, 헤더마다 UserAgent()로 데이터 다시 읽음
+- 새 방식: import 때는 아무것도 안 읽고, 첫 헤더 때 한 번만 읽은 뒤 호스트별로 재사용
+"""
+import os
+import sys
+import subprocess
+import timeit
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+URL = "https://dorm.cnu.ac.kr/_prog/_board/?code=sub03_0301&site_dvs_cd=kr&menu_dvs_cd=0301"
+CALLS = 20        # 한 주기에 헤더를 만드는 횟수 (게시판 수 x 주기 예상치)
+RUNS = 5          # 새 프로세스 측정 반복 (중간값 사용)
+
+# 새 프로세스에서 돌릴 코드: import 시간, 첫 호출 시간, 이후 CALLS번 시간(ms)을 출력
+OLD_CODE = """
+import sys, time
+sys.path.insert(0, {src!r})
+import http_client
+t0 = time.perf_counter()
+from fake_useragent import UserAgent
+t1 = time.perf_counter()
+def get_random_headers():
+    ua = UserAgent()
+    return {{'User-Agent': ua.random, 'Accept': 'text/html', 'Connection': 'keep-alive'}}
+get_random_headers()
+t2 = time.perf_counter()
+for _ in range({calls}): get_random_headers()
+t3 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000)
+"""
+
+NEW_CODE = """
+import sys, time
+sys.path.insert(0, {src!r})
+import http_client
+t0 = time.perf_counter()
+import header_profile
+t1 = time.perf_counter()
+header_profile.headers_for({url!r})
+t2 = time.perf_counter()
+for _ in range({calls}): header_profile.headers_for({url!r})
+t3 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000, (t3 - t2) * 1000)
+"""
+
+
+def run_fresh(code):
+    """새 프로세스에서 RUNS번 실행 -> 항목별 중간값"""
+    results = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        results.append([float(x) for x in output.split()[-3:]])
+    return [sorted(column)[len(column) // 2] for column in zip(*results)]
+
+
+# ===[MAIN]===
+if __name__ == "__main__":
+    try:
+        import fake_useragent  # noqa: F401
+    except ImportError:
+        print("fake_useragent 설치 안 됨 - 기존 방식 측정 불가")
+        sys.exit(1)
+
+    old = run_fresh(OLD_CODE.format(src=SRC_DIR, calls=CALLS))
+    new = run_fresh(NEW_CODE.format(src=SRC_DIR, url=URL, calls=CALLS))
+
+    print(f"{'방식':<16}{'import(ms)':>12}{'첫 호출(ms)':>14}{f'이후 {CALLS}회(ms)':>16}")
+    print(f"{'UserAgent() 매번':<16}{old[0]:>12.2f}{old[1]:>14.2f}{old[2]:>16.2f}")
+    print(f"{'header_profile':<16}{new[0]:>12.2f}{new[1]:>14.2f}{new[2]:>16.2f}")
+
+    # 같은 프로세스에서 이미 읽은 뒤의 호출 1회 비용
+    import header_profile
+    header_profile.headers_for(URL)
+    per_call = timeit.timeit(lambda: header_profile.headers_for(URL), number=10000) / 10000 * 1000
+    print(f"\nheader_profile 호출 1회 (데이터 읽은 뒤): {per_call:.4f} ms")
@@ -0,0 +1,5 @@
+# python src [--bots cse,dorm,library,with] [--once | --daemon] [--concurrency N]
+# (src 폴더를 그대로 실행 -> scheduler.main)
+import scheduler
+
+scheduler.main()
@@ -0,0 +1,92 @@
+import os
+
+import seen_ids
+import dedup
+import notice_archive
+import message_packer
+import webhook_queue
+
+# ===[게시판 새 글 처리]==========================
+# 봇(cse/dorm/library, 데몬 포함)이 게시판 한 페이지를 읽은 뒤 공통으로 하는 일
+# 1) 최초 실행이면 기준점만 기록 (전송 X)
+# 2) 지난번에 못 보낸 글(이미 전송 대기열에 있음)은 다시 넣지 않음
+# 3) 다른 게시판/봇에서 이미 보낸 같은 제목은 제외 (dedup)
+# 4) 나머지는 디스코드 제한에 맞춰 나눠서 대기열에 넣음 (실행 끝에 다른 게시판 글과 합쳐서 전송)
+# 5) 본 글 번호 갱신 - 대기열에 넣은 글은 전송이 확인된 뒤(webhook_queue.flush -> apply_acked) 기록
+# ==========================================
+
+
+def notice_blocks(notices):
+    """글 한 건당 한 줄 (▶ 고정글 / ▷ 일반글)"""
+    blocks = []
+    for notice in notices:
+        icon = "▶" if notice['is_top'] else "▷"
+        blocks.append(f"{icon} [{notice['title']}](<{notice['link']}>)\n")
+    return blocks
+
+
+def enqueue_notices(webhook_env, header, notices, board_key, name):
+    """
+    새 글을 메시지로 만들어 대기열에 넣음
+    header: 제목줄 ("{count}" 자리에 글 수), board_key: 본 글 목록이 저장된 데이터 파일 키
+    """
+    count = len(notices)
+    refs = [seen_ids.ref(board_key, n['id']) for n in notices]
+    for payload, payload_refs in message_packer.build(header.format(count=count), notice_blocks(notices), refs):
+        webhook_queue.enqueue(webhook_env, payload, payload_refs)
+    print(f"✉ [전송 대기] {name} - {count}건")
+
+
+def handle_page(saved_data, seen, new_notices, source, board, board_key, name, header, webhook_env, alert=None):
+    """
+    scan_new 결과(new_notices) 처리 후 saved_data[board_key] 갱신
+    source/board: 봇 태그/게시판 이름 (dedup, 기록 DB에 쓰는 이름)
+    seen: seen_ids.load() 결과 (None이면 최초 실행)
+    alert: 웹후크 URL이 없을 때 부를 관리자 알림 함수 (없으면 경고만 출력)
+    """
+    # 이번 페이지에서 찾은 글은 전부 기록 (전송 시각은 전송 확인 뒤 apply_acked에서)
+    notice_archive.archive(source, board, new_notices)
+
+    # 최초 실행 - 기준점만 설정
+    if seen is None:
+        if not new_notices: return True
+        seen = seen_ids.empty()
+        seen_ids.record(seen, new_notices)
+        saved_data[board_key] = seen_ids.dump(seen)
+        dedup.remember(source, board, new_notices)
+        print(f"☐ [{name}] 최초 실행 - 기준점(ID: {seen_ids.newest(seen)})만 설정, 전송 X")
+        return True
+
+    queued = []
+    if new_notices:
+        new_notices.sort(key=lambda x: x['id'])
+        pending = webhook_queue.pending_refs(webhook_env)
+        new_notices = [n for n in new_notices if seen_ids.ref(board_key, n['id']) not in pending]
+        fresh = dedup.filter_new(source, board, new_notices)
+        if fresh and not os.environ.get(webhook_env):
+            print("⚠ 웹후크 URL이 없음")
+            if alert: alert("웹후크 URL이 없음")
+        elif fresh:
+            enqueue_notices(webhook_env, header, fresh, board_key, name)
+            queued = fresh
+
+    # 새 글이 없어도 해시는 바뀌었으므로 저장 (오래된 번호 정리 포함)
+    seen_ids.record(seen, [n for n in new_notices if n not in queued])
+    saved_data[board_key] = seen_ids.dump(seen)
+    return True
+
+
+def apply_acked(source, saved_data, refs, boards=None, now=None):
+    """
+    전송 확인된 refs(webhook_queue.flush 결과) -> 본 글 목록 추가 + 기록 DB 전송 시각
+    boards: 데이터 파일 키 -> 기록 DB 게시판 이름 (다를 때만, 예: 도서관 {"seen": "general"})
+    반환: 본 글 목록이 바뀌었으면 True
+    """
+    by_board = {}
+    for r in refs:
+        board_key, _, article_id = str(r).rpartition(":")
+        if board_key and article_id.isdigit():
+            by_board.setdefault(board_key, []).append(int(article_id))
+    for board_key, article_ids in by_board.items():
+        notice_archive.mark_sent(source, (boards or {}).get(board_key, board_key), article_ids, now)
+    return seen_ids.apply_refs(saved_data, refs, now)
@@ -0,0 +1,199 @@
+import os
+
+import seen_ids
+from page_cache import tbody_bytes
+
+# ===[파서 선택]==========================
+# lxml(스트리밍) > selectolax > BeautifulSoup(html.parser) 순서로 있는 것 사용
+# BOARD_PARSER 환경변수로 강제 지정 가능 (lxml / selectolax / bs4)
+BACKEND = os.environ.get("BOARD_PARSER")
+
+if BACKEND in (None, "lxml"):
+    try:
+        from lxml import etree
+        BACKEND = "lxml"
+    except ImportError:
+        BACKEND = None
+
+if BACKEND in (None, "selectolax"):
+    try:
+        # selectolax 1.0부터는 lexbor 백엔드만 지원
+        from selectolax.lexbor import LexborHTMLParser as HTMLParser
+        BACKEND = "selectolax"
+    except ImportError:
+        try:
+            from selectolax.parser import HTMLParser
+            BACKEND = "selectolax"
+        except ImportError:
+            BACKEND = None
+
+if BACKEND not in ("lxml", "selectolax"):
+    from bs4 import BeautifulSoup
+    BACKEND = "bs4"
+
+# lxml에 한 번에 넣는 바이트 수 (필요한 줄까지만 파싱하도록)
+CHUNK_SIZE = 8192
+# ==========================================
+
+# 각 줄(tr)은 파서와 상관없이 아래 모양의 dict로 정규화됨
+# {
+#     "classes": ["b-top-box"],                  # tr의 class
+#     "cells": {"num": "공지", "title": "..."},   # td class -> 텍스트
+#     "links": [{"href", "title", "text", "parent", "cell"}]
+#               # parent: a 바로 위 요소의 class / cell: a를 감싼 td의 class
+# }
+
+
+# ===[lxml]===
+def _cell_classes(el):
+    while el is not None and el.tag != "td":
+        el = el.getparent()
+    if el is None: return []
+    return (el.get("class") or "").split()
+
+
+def _normalize_lxml(tr):
+    cells = {}
+    for td in tr.iter("td"):
+        text = "".join(td.itertext())
+        for cls in (td.get("class") or "").split():
+            cells.setdefault(cls, text)
+
+    links = []
+    for a in tr.iter("a"):
+        parent = a.getparent()
+        links.append({
+            "href": a.get("href") or "",
+            "title": a.get("title") or "",
+            "text": "".join(a.itertext()),
+            "parent": (parent.get("class") or "").split() if parent is not None else [],
+            "cell": _cell_classes(a),
+        })
+    return {"classes": (tr.get("class") or "").split(), "cells": cells, "links": links}
+
+
+def _iter_lxml(body, encoding):
+    # tbody만 잘라왔으므로 table로 감싸서 넣기
+    parser = etree.HTMLPullParser(events=("end",), tag="tr", encoding=encoding)
+    parser.feed(b"<table>")
+    for i in range(0, len(body), CHUNK_SIZE):
+        parser.feed(body[i:i + CHUNK_SIZE])
+        for _, tr in parser.read_events():
+            yield _normalize_lxml(tr)
+            tr.clear()
+    parser.feed(b"</tbody></table>")
+    parser.close()
+    for _, tr in parser.read_events():
+        yield _normalize_lxml(tr)
+
+
+# ===[selectolax]===
+def _normalize_selectolax(tr):
+    cells = {}
+    for td in tr.css("td"):
+        text = td.text()
+        for cls in (td.attributes.get("class") or "").split():
+            cells.setdefault(cls, text)
+
+    links = []
+    for a in tr.css("a"):
+        parent = a.parent
+        td = a.parent
+        while td is not None and td.tag != "td":
+            td = td.parent
+        links.append({
+            "href": a.attributes.get("href") or "",
+            "title": a.attributes.get("title") or "",
+            "text": a.text(),
+            "parent": (parent.attributes.get("class") or "").split() if parent is not None else [],
+            "cell": (td.attributes.get("class") or "").split() if td is not None else [],
+        })
+    return {"classes": (tr.attributes.get("class") or "").split(), "cells": cells, "links": links}
+
+
+def _iter_selectolax(body, encoding):
+    tree = HTMLParser((b"<table>" + body + b"</tbody></table>").decode(encoding, errors="replace"))
+    for tr in tree.css("tr"):
+        yield _normalize_selectolax(tr)
+
+
+# ===[BeautifulSoup]===
+def _normalize_bs4(tr):
+    cells = {}
+    for td in tr.find_all("td"):
+        text = td.get_text()
+        for cls in td.get("class", []):
+            cells.setdefault(cls, text)
+
+    links = []
+    for a in tr.find_all("a"):
+        td = a.find_parent("td")
+        links.append({
+            "href": a.get("href") or "",
+            "title": a.get("title") or "",
+            "text": a.text,
+            "parent": a.parent.get("class", []) if a.parent else [],
+            "cell": td.get("class", []) if td else [],
+        })
+    return {"classes": tr.get("class", []), "cells": cells, "links": links}
+
+
+def _iter_bs4(body, encoding):
+    soup = BeautifulSoup(b"<table>" + body + b"</tbody></table>", "html.parser", from_encoding=encoding)
+    for tr in soup.select("tr"):
+        yield _normalize_bs4(tr)
+
+
+# ===[공통 진입점]===
+def iter_rows(content, encoding="utf-8"):
+    """
+    응답 바이트의 tbody 안 <tr>을 위에서부터 하나씩 정규화해서 내보냄
+    제너레이터라 호출한 쪽에서 멈추면 나머지는 파싱하지 않음 (lxml)
+    """
+    body = tbody_bytes(content)
+    if BACKEND == "lxml":
+        return _iter_lxml(body, encoding)
+    if BACKEND == "selectolax":
+        return _iter_selectolax(body, encoding)
+    return _iter_bs4(body, encoding)
+
+
+def find_link(row, parent=None, cell=None):
+    """조건(바로 위 요소 class / 감싼 td class)에 맞는 첫 링크"""
+    for link in row["links"]:
+        if parent and parent not in link["parent"]: continue
+        if cell and cell not in link["cell"]: continue
+        return link
+    return None
+
+
+# ===[새 글 스캔]===
+def scan_new(rows, parse_row, seen):
+    """
+    위에서부터 줄을 읽으며 아직 안 본 글 수집 (seen: seen_ids 상태, None이면 최초 실행 -> 전부)
+    - 고정글(is_top: b-top-box / always / 공지)은 번호 순서와 상관없으므로 전부 확인
+    - 일반글은 최신순이라 이미 본 글이 STOP_AFTER_SEEN번 연속 나오거나
+      floor 아래로 내려가면 그 아래는 읽지 않음 (바로 아래 끼어든 늦은 글은 잡힘)
+    반환: (새 글 목록, 읽은 줄 수)
+    """
+    new_notices = []
+    found = set()
+    row_count = 0
+    seen_run = 0
+
+    for row in rows:
+        row_count += 1
+        notice = parse_row(row)
+        if not notice or notice["id"] in found: continue
+
+        if seen is None or not seen_ids.contains(seen, notice["id"]):
+            new_notices.append(notice)
+            found.add(notice["id"])
+            if not notice["is_top"]: seen_run = 0
+        elif not notice["is_top"]:
+            # 이미 본 일반글
+            seen_run += 1
+            if seen_run >= seen_ids.STOP_AFTER_SEEN or notice["id"] < seen["floor"]:
+                break
+
+    return new_notices, row_count
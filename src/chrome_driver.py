@@ -0,0 +1,213 @@
+import os
+import re
+import shutil
+import subprocess
+
+import state_store
+
+# ===[설정 영역]==========================
+# 크롬드라이버 경로를 크롬 버전별로 기억해두고 다음 실행 때는 파일 확인(stat)만 함
+# (매번 ChromeDriverManager().install()로 버전 확인/다운로드하지 않음)
+# 캐시 파일은 저장소에 안 올림 -> 오래 켜두는 로컬/서버에서만 효과 있음
+# GitHub Actions는 setup-chrome이 같이 설치한 드라이버를 CHROMEDRIVER_PATH로 넘겨서 확인 자체를 생략
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, "..", "data", "chromedriver_cache.json")
+# 직접 지정 (있으면 이것만 사용)
+DRIVER_PATH = os.environ.get("CHROMEDRIVER_PATH")
+CHROME_BIN = os.environ.get("CHROME_BIN")
+# 1이면 네트워크로 드라이버를 받지 않음 (캐시/서버 드라이버가 없으면 셀레니움 기본 동작)
+OFFLINE = os.environ.get("CHROMEDRIVER_OFFLINE") == "1"
+
+SERVER_DRIVER = "/usr/bin/chromedriver"
+CHROME_NAMES = ["google-chrome", "google-chrome-stable", "chrome", "chromium", "chromium-browser"]
+
+# [스크랩용 실행 설정] 목록 읽기/로그인에 필요 없는 것은 끔
+# CHROME_SCRAPE_PROFILE=0 이면 끔 (로컬에서 화면 보면서 확인할 때)
+SCRAPE_PROFILE = os.environ.get("CHROME_SCRAPE_PROFILE", "1") != "0"
+SCRAPE_ARGS = [
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-sync",
+    "--disable-default-apps",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-domain-reliability",
+    "--disable-client-side-phishing-detection",
+    "--disable-breakpad",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--disable-gpu",
+    "--disable-gpu-shader-disk-cache",   # GrShaderCache / GraphiteDawnCache
+    "--disk-cache-size=1",
+    "--media-cache-size=1",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-features=OptimizationHints,OptimizationGuideModelDownloading,OptimizationHintsFetching,"
+    "OptimizationTargetPrediction,Translate,MediaRouter,AutofillServerCommunication,InterestFeedContentSuggestions",
+]
+SCRAPE_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "credentials_enable_service": False,
+    "profile.password_manager_enabled": False,
+}
+# 네트워크 단계에서 막을 요청 (CSS는 표시 여부 판단에 필요해서 막지 않음)
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg",
+]
+# 프로필 폴더에서 지워도 되는 캐시 (로그인 쿠키는 Default/Network/Cookies 에 있어서 남음)
+PROFILE_JUNK = [
+    "GrShaderCache", "GraphiteDawnCache", "ShaderCache", "optimization_guide_model_store",
+    "segmentation_platform", "Crashpad", "CrashpadMetrics-active.pma", "DevToolsActivePort",
+    "Default/Cache", "Default/Code Cache", "Default/GPUCache", "Default/DawnWebGPUCache",
+    "Default/DawnGraphiteCache", "Default/Service Worker", "Default/shared_proto_db",
+    "Default/optimization_guide_hint_cache_store", "Default/Segmentation Platform",
+    "Default/Feature Engagement Tracker", "Default/Site Characteristics Database",
+    "Default/Download Service", "Default/BudgetDatabase", "Default/GCM Store",
+    "Default/discounts_db", "Default/discount_infos_db", "Default/commerce_subscription_db",
+    "Default/chrome_cart_db", "Default/parcel_tracking_db", "Default/AutofillAiModelCache",
+]
+# 로그인에 필요한 쿠키 도메인 (나머지 쿠키는 로그인 후 삭제)
+KEEP_COOKIE_DOMAIN = "cnu.ac.kr"
+# ==========================================
+
+# 캐시 파일 모양
+# {
+#     "chrome": {"path", "mtime", "size", "version"},    # 크롬 파일이 그대로면 버전 다시 안 물어봄
+#     "drivers": {"120": "/home/.../chromedriver", ...}   # 크롬 메이저 버전 -> 드라이버 경로
+# }
+
+
+def _is_executable(path):
+    return bool(path) and os.path.isfile(path) and os.access(path, os.X_OK)
+
+
+def _major_version(path):
+    """'--version' 출력에서 메이저 버전 (예: Google Chrome 120.0.6099.109 -> "120")"""
+    try:
+        output = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=10).stdout
+        match = re.search(r"(\d+)\.\d+\.\d+", output)
+        return match.group(1) if match else None
+    except Exception:
+        return None
+
+
+def find_chrome():
+    if CHROME_BIN: return CHROME_BIN
+    for name in CHROME_NAMES:
+        path = shutil.which(name)
+        if path: return path
+    return None
+
+
+def chrome_version(cache):
+    """설치된 크롬 메이저 버전 (파일이 안 바뀌었으면 캐시 값, 모르면 None)"""
+    path = find_chrome()
+    if not path: return None
+    try: stat = os.stat(path)
+    except OSError: return None
+
+    known = cache.get("chrome") or {}
+    if known.get("path") == path and known.get("mtime") == stat.st_mtime and known.get("size") == stat.st_size:
+        return known.get("version")
+
+    version = _major_version(path)
+    cache["chrome"] = {"path": path, "mtime": stat.st_mtime, "size": stat.st_size, "version": version}
+    state_store.save(CACHE_FILE, cache)
+    return version
+
+
+def _download():
+    """webdriver-manager로 받기 (없거나 실패하면 None)"""
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+        return ChromeDriverManager().install()
+    except Exception as e:
+        print(f"⚠ 크롬드라이버 다운로드 실패: {e}")
+        return None
+
+
+def resolve():
+    """
+    크롬드라이버 경로 (None이면 셀레니움이 알아서 찾게 둠)
+    순서: CHROMEDRIVER_PATH -> 캐시(버전 일치 + 파일 존재) -> 서버 드라이버 -> 다운로드
+    """
+    if DRIVER_PATH: return DRIVER_PATH
+
+    cache = state_store.load(CACHE_FILE)
+    drivers = cache.setdefault("drivers", {})
+    version = chrome_version(cache)
+    key = version or "unknown"
+
+    path = drivers.get(key)
+    if _is_executable(path):
+        return path
+
+    # 서버에 깔린 드라이버는 크롬과 버전이 맞을 때만 (크롬 버전을 모르면 그냥 사용)
+    if _is_executable(SERVER_DRIVER) and (version is None or _major_version(SERVER_DRIVER) in (version, None)):
+        print(f"💻 서버 드라이버 사용: {SERVER_DRIVER}")
+        path = SERVER_DRIVER
+    elif OFFLINE:
+        print("💻 오프라인 모드: 셀레니움 기본 드라이버 관리 사용")
+        return None
+    else:
+        print(f"☐ 크롬 {key} 드라이버 준비 중...")
+        path = _download()
+        if not path: return None
+
+    drivers[key] = path
+    state_store.save(CACHE_FILE, cache)
+    return path
+
+
+def service():
+    """크롬드라이버 Service (경로를 못 찾으면 Selenium 4.6+ 자동 관리)"""
+    from selenium.webdriver.chrome.service import Service
+    path = resolve()
+    return Service(path) if path else Service()
+
+
+# ===[스크랩용 브라우저]===
+def apply_scrape_profile(options):
+    """Options에 스크랩용 실행 인자/설정 추가"""
+    if not SCRAPE_PROFILE: return options
+    for arg in SCRAPE_ARGS:
+        options.add_argument(arg)
+    options.add_experimental_option("prefs", SCRAPE_PREFS)
+    return options
+
+
+def block_resources(driver):
+    """이미지/폰트/미디어 요청을 CDP로 차단 (실패해도 진행)"""
+    if not SCRAPE_PROFILE: return
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    except Exception as e:
+        print(f"⚠ 리소스 차단 설정 실패: {e}")
+
+
+def prune_profile(profile_dir):
+    """브라우저 띄우기 전에 프로필 폴더의 캐시 정리 (쿠키/설정은 유지)"""
+    for name in PROFILE_JUNK:
+        path = os.path.join(profile_dir, *name.split("/"))
+        try:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def keep_login_cookies(driver, domain=KEEP_COOKIE_DOMAIN):
+    """로그인에 필요 없는 다른 사이트 쿠키 삭제 (프로필에 쌓이지 않도록)"""
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {}).get("cookies", [])
+        for cookie in cookies:
+            if not cookie["domain"].lstrip(".").endswith(domain):
+                driver.execute_cdp_cmd("Network.deleteCookies", {
+                    "name": cookie["name"], "domain": cookie["domain"], "path": cookie.get("path", "/")})
+    except Exception:
+        pass
@@ -1 +0,0 @@
-Ʋ H
\ No newline at end of file
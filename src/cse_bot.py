@@ -1,20 +1,24 @@
-from curl_cffi import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback
-import random
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
+import env_loader
 
-load_dotenv()
+import http_client
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
+
+env_loader.load()
 
 # ===[설정 영역]==========================
-DISCORD_WEBHOOK_URL = os.environ.get("cse_WEBHOOK_URL")
+# 전송은 webhook_queue가 이 환경변수에서 URL을 읽어서 처리
+WEBHOOK_ENV = "cse_WEBHOOK_URL"
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "..", "data", "cse_data.json")
@@ -58,9 +62,8 @@ HEADERS = {
 
 # ===[세션 생성기]===
 def get_session():
-    """Retry 가능한 세션 생성"""
-    session = requests.Session()
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(TARGET_BOARDS[0]["url"])
 
 
 # ===[ID 추출기]===
@@ -72,28 +75,34 @@ def extract_article_id(link):
     return 0
 
 
-# ===[디코 전송기]===
-def send_discord_batch_alert(category_name, new_notices):
-    """디스코드 전송"""
-    if not new_notices:
-        return
+# ===[행 파싱]===
+def parse_row(row, url):
+    """정규화된 줄(board_parser) -> 공지 dict (게시글 줄이 아니면 None)"""
+    title_div = board_parser.find_link(row, parent="b-title-box")
+    if not title_div:
+        return None
 
-    if not DISCORD_WEBHOOK_URL:
-        print("⚠ 웹후크 URL이 없음")
-        return
+    title = title_div['title'] or title_div['text'].strip()
+    title = title.replace("자세히 보기", "").strip()
     
-    count = len(new_notices)
-    message_content = f"### 📢 [{category_name}] 새 글 {count}건\n\n"
+    href = title_div['href']
     
-    for notice in new_notices:
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{notice['title']}](<{notice['link']}>)\n"
-
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content}, timeout=5)
-        print(f"✉ [전송 완료] {category_name} - {count}건")
-    except Exception as e:
-        print(f"⚠ [전송 실패] {e}")
+    if href.startswith('?'):
+        base_url = url.split('?')[0]
+        link = f"{base_url}{href}"
+    else:
+        link = href
+    
+    article_id = extract_article_id(link)
+    if article_id == 0:
+        return None
+
+    return {
+        "id": article_id,
+        "title": title,
+        "link": link,
+        "is_top": 'b-top-box' in row['classes']
+    }
 
 
 # ===[관리자 알림]===
@@ -113,10 +122,9 @@ def send_simple_error_log(error_msg=None):
     else:
         content = f"🚨 **[CSE 공지봇 치명적 오류]** \n{now}"
     
-    try:
-        requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
+    if webhook_queue.send_now(MONITOR_WEBHOOK_URL, content):
         print("✉ [관리자 알림 전송 완료]")
-    except:
+    else:
         print("⚠ 관리자 알림 전송 실패")
 
 
@@ -130,71 +138,42 @@ def check_board(session, board_info, saved_data):
     print(f"● [{board_name}] 분석 중...")
 
     try:
-        sleep_time = random.uniform(3, 6) 
-        time.sleep(sleep_time)
-        
-        # 차단 방지? (원리는 잘 모르겠음...)
-        response = session.get(url, headers=HEADERS, timeout=30, impersonate="chrome120")
-        
-        response.encoding = 'utf-8'
-        soup = BeautifulSoup(response.text, 'html.parser')
-        rows = soup.select('table.board-table tbody tr')
+        # 차단 방지 (크롬 TLS 흉내는 http_client 세션 설정)
+        response = session.get(url, headers=page_cache.conditional_headers(url, HEADERS, board_id in saved_data), timeout=30)
+
+        # 304(변경 없음)면 파싱 생략
+        if page_cache.is_unchanged(response):
+            print(f"☒ [{board_name}] 변경 없음 (캐시)")
+            return False
+
+        # 목록(tbody) 해시가 지난번과 같으면 파싱 생략
+        hash_key = f"{board_id}_hash"
+        unchanged, body_hash = page_cache.same_body(saved_data, hash_key, response)
+        if unchanged:
+            # 목록은 그대로여도 검증값(ETag 등)이 새로 왔으면 기록 (다음엔 304)
+            page_cache.remember(url, response)
+            print(f"☒ [{board_name}] 변경 없음 (해시)")
+            return False
         
-        if not rows:
+        # 본 글 번호 목록 (없으면 최초 실행)
+        seen = seen_ids.load(saved_data.get(board_id))
+
+        # 줄 단위로 파싱 (lxml 있으면 스트리밍), 이미 본 일반글이 이어지면 중단
+        rows = board_parser.iter_rows(response.content)
+        new_notices, row_count = board_parser.scan_new(rows, lambda row: parse_row(row, url), seen)
+
+        if not row_count:
             print(f"⚠ [{board_name}] 게시글을 찾을 수 없음 (HTML 구조 변경 가능성)")
             return False
-        
-        last_id = saved_data.get(board_id, 0)
-        new_notices = []
-        max_id = last_id
-
-        for row in rows:
-            title_div = row.select_one('.b-title-box > a')
-            if not title_div:
-                continue 
-
-            title = title_div.get('title') or title_div.text.strip()
-            title = title.replace("자세히 보기", "").strip()
-            
-            href = title_div.get('href')
-            
-            if href.startswith('?'):
-                base_url = url.split('?')[0]
-                link = f"{base_url}{href}"
-            else:
-                link = href
-            
-            article_id = extract_article_id(link)
-            if article_id == 0:
-                continue
-
-            row_classes = row.get('class', [])
-            is_top = 'b-top-box' in row_classes
-
-            if article_id > last_id:
-                new_notices.append({
-                    "id": article_id,
-                    "title": title,
-                    "link": link,
-                    "is_top": is_top
-                })
-                if article_id > max_id:
-                    max_id = article_id
-
-        # 최초 실행 처리
-        if last_id == 0 and max_id > 0:
-            print(f"☐ [{board_name}] 최초 실행 - 기준점(ID: {max_id})만 설정, 전송 X")
-            saved_data[board_id] = max_id
-            return True
-        
-        # 새 글이 있으면 처리
-        if new_notices:
-            new_notices.sort(key=lambda x: x['id'])
-            send_discord_batch_alert(board_name, new_notices)
-            saved_data[board_id] = max_id
-            return True
-        
-        return False
+
+        # 파싱 끝난 페이지 검증값/해시 기록
+        page_cache.remember(url, response)
+        saved_data[hash_key] = body_hash
+
+        # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+        board_alerts.handle_page(saved_data, seen, new_notices, "cse", board_id, board_id,
+                                 board_name, f"### 📢 [{board_name}] 새 글 {{count}}건\n\n", WEBHOOK_ENV)
+        return True
 
     except Exception as e:
         print(f"⚠ [{board_name}] 에러: {e}")
@@ -208,35 +187,31 @@ def run_bot():
     print("\n" + "━" * 40)
     print(f"🤖 CSE 공지봇 실행: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # SSL 경고 무시
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-
     try:
-        saved_data = {}
-
         # 파일 읽기
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                try:
-                    saved_data = json.load(f)
-                except:
-                    saved_data = {}
+        saved_data = state_store.load(DATA_FILE)
 
         session = get_session()
         any_changes = False
 
         # 게시판 목록 반복
         for board in TARGET_BOARDS:
+            rate_limiter.wait_for(board["url"])
             if check_board(session, board, saved_data):
                 any_changes = True
-        
+
+        # 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 실행 때 재전송)
+        if board_alerts.apply_acked("cse", saved_data, webhook_queue.flush(WEBHOOK_ENV)):
+            any_changes = True
+
         # 변경사항 있으면 저장
         if any_changes:
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump(saved_data, f, ensure_ascii=False, indent=4)
+            state_store.save(DATA_FILE, saved_data)
             print("☑ 데이터 저장 완료")
         else:
             print("☒ 변동 사항 없음")
+        page_cache.save()
+        dedup.save()
 
     except Exception as e:
         print(f"⚠ 치명적인 오류 발생: {e}")
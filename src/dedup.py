@@ -0,0 +1,120 @@
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import state_store
+
+# ===[설정 영역]==========================
+# 같은 공지가 여러 게시판(학사/일반/사업단, 다른 봇)에 올라오면 처음 한 번만 전송
+# 파일은 state_store.DATA_DIR 아래 (한 번 실행 봇은 data/, 데몬은 src/data/ - 봇 상태/전송 대기열과 같은 폴더)
+DATA_NAME = "dedup_data.json"
+WINDOW = 3 * 24 * 3600   # 이 기간 안에 같은 제목이면 중복으로 취급
+MAX_SIZE = 2000          # 기억할 제목 수 (넘으면 오래 안 쓴 것부터 삭제)
+# ==========================================
+
+# 데이터 파일 모양
+# {"titles": {"<제목 해시>": [처음 본 시각, "cse/bachelor"], ...}}  (오래된 것 -> 최근 것 순서)
+# 같은 폴더를 쓰는 봇 프로세스끼리는 같은 파일을 쓰므로 저장할 때 파일을 다시 읽어 합침 (제목마다 최근 기록 유지)
+
+_titles = None
+_dirty = False
+_lock = threading.Lock()
+
+_NOISE = re.compile(r"자세히\s*보기|새글")
+_BRACKETS = re.compile(r"[\[\]\(\)\{\}<>【】〔〕「」『』〈〉《》]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_title(title):
+    """비교용 제목 ('자세히 보기'/'새글', 괄호, 공백 제거 + 소문자)"""
+    title = _NOISE.sub(" ", title or "")
+    title = _BRACKETS.sub(" ", title)
+    return _SPACES.sub("", title).lower()
+
+
+def title_key(title):
+    return hashlib.blake2b(normalize_title(title).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _data_file():
+    return state_store.data_path(DATA_NAME)
+
+
+def _load():
+    """데이터 파일은 처음 쓸 때 한 번만 읽음"""
+    global _titles
+    if _titles is None:
+        _titles = OrderedDict(state_store.load(_data_file()).get("titles", {}))
+    return _titles
+
+
+def _claim(titles, notice, where, now):
+    """
+    처음 보는 제목이면 등록 후 True, 기간 안에 다른 게시판에서 본 제목이면 False
+    (같은 게시판이면 통과 - 전송 실패로 다시 잡힌 글이 중복으로 걸러지지 않도록)
+    """
+    key = title_key(notice["title"])
+    entry = titles.get(key)
+    if entry and entry[1] != where and now - entry[0] <= WINDOW:
+        titles.move_to_end(key)
+        return False
+    titles[key] = [now, where]
+    titles.move_to_end(key)
+    while len(titles) > MAX_SIZE:
+        titles.popitem(last=False)
+    return True
+
+
+# ===[진입점]===
+def filter_new(source, board, notices, now=None):
+    """전송할 글만 남김 (다른 게시판/봇에서 이미 보낸 제목은 제외)"""
+    global _dirty
+    if not notices: return notices
+    now = int(now or time.time())
+    where = f"{source}/{board}"
+    with _lock:
+        titles = _load()
+        fresh = []
+        for notice in notices:
+            if _claim(titles, notice, where, now):
+                fresh.append(notice)
+            else:
+                print(f"☒ [{where}] 다른 게시판에서 이미 보낸 공지 생략: {notice['title']}")
+        _dirty = True
+    return fresh
+
+
+def remember(source, board, notices, now=None):
+    """전송 없이 제목만 기록 (최초 실행 기준점)"""
+    global _dirty
+    if not notices: return
+    now = int(now or time.time())
+    with _lock:
+        titles = _load()
+        for notice in notices:
+            _claim(titles, notice, f"{source}/{board}", now)
+        _dirty = True
+
+
+def _merge_into(disk):
+    """파일에 있는 기록 + 이 프로세스 기록 (같은 제목이면 더 최근 것)"""
+    titles = OrderedDict(disk.get("titles", {}))
+    for key, entry in _titles.items():
+        if key not in titles or titles[key][0] <= entry[0]:
+            titles[key] = entry
+        titles.move_to_end(key)
+    while len(titles) > MAX_SIZE:
+        titles.popitem(last=False)
+    return {"titles": dict(titles)}
+
+
+def save():
+    """변경된 경우에만 데이터 파일 저장 (다른 프로세스가 저장한 기록과 합침)"""
+    global _dirty, _titles
+    with _lock:
+        if not _dirty: return
+        data = state_store.update(_data_file(), _merge_into)
+        _titles = OrderedDict(data["titles"])
+        _dirty = False
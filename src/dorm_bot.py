@@ -1,20 +1,24 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback 
-import random
-from fake_useragent import UserAgent
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
-load_dotenv()
+import env_loader
+env_loader.load()
+
+import http_client
+import header_profile
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
 
 # ===[설정 영역]==========================
-DISCORD_WEBHOOK_URL = os.environ.get("dorm_WEBHOOK_URL") 
+# 전송은 webhook_queue가 이 환경변수에서 URL을 읽어서 처리
+WEBHOOK_ENV = "dorm_WEBHOOK_URL"
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL") # 관리자 알림용
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "..", "data", "dorm_data.json")
@@ -38,25 +42,15 @@ TARGET_BOARDS = [
 ]
 # ==========================================
 
-# ===[랜덤 헤더 생성기]===
+# ===[헤더 생성기]===
 def get_random_headers():
-    ua = UserAgent()
-    return {
-        'User-Agent': ua.random,
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-        'Connection': 'keep-alive',
-        'Referer': 'https://dorm.cnu.ac.kr/'
-    }
+    """호스트마다 고정된 브라우저 헤더 (UA 데이터는 처음 한 번만 읽음, header_profile)"""
+    return header_profile.headers_for(TARGET_BOARDS[0]["url"], referer='https://dorm.cnu.ac.kr/')
 
 # ===[세션 생성기]===
 def get_session():
-    """Retry 가능한 세션 생성"""
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(TARGET_BOARDS[0]["url"])
 
 # ===[ID 추출기]===
 def extract_id_from_link(link):
@@ -66,27 +60,33 @@ def extract_id_from_link(link):
         return int(match.group(1))
     return 0
 
-# ===[디코 전송기]===
-def send_discord_batch_alert(category_name, new_notices):
-    if not new_notices: return
-    
-    if not DISCORD_WEBHOOK_URL:
-        print("⚠ 웹후크 URL이 없음")
-        send_simple_error_log("웹후크 URL이 없음")
-        return
+# ===[행 파싱]===
+def parse_row(row):
+    """정규화된 줄(board_parser) -> 공지 dict (게시글 줄이 아니면 None)"""
+    a_tag = board_parser.find_link(row, cell="title")
+    if not a_tag: return None
 
-    count = len(new_notices)
-    message_content = f"### 🛌 [{category_name}] 새 글 {count}건\n\n"
+    title = a_tag['title'] or a_tag['text'].strip()
+    href = a_tag['href']
     
-    for notice in new_notices:
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{notice['title']}](<{notice['link']}>)\n"
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content})
-        print(f"✉ [전송 완료] {category_name} - {count}건")
-    except Exception as e:
-        print(f"⚠ [전송 실패] {e}")
-        send_simple_error_log("공지 전송 실패")
+    if href.startswith("?"):
+        link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
+    elif href.startswith("/"):
+        link = f"https://dorm.cnu.ac.kr{href}"
+    else:
+        link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
+
+    article_id = extract_id_from_link(link)
+    if article_id == 0: return None
+
+    is_top = "공지" in row['cells'].get('num', "")
+
+    return {
+        "id": article_id,
+        "title": title,
+        "link": link,
+        "is_top": is_top
+    }
 
 # 관리자 함수
 def send_simple_error_log(error_msg=None):
@@ -102,10 +102,9 @@ def send_simple_error_log(error_msg=None):
         )
     else:
         content = f"🚨 **[기숙사 봇 오류]** \n{now}"
-    try:
-        requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
+    if webhook_queue.send_now(MONITOR_WEBHOOK_URL, content):
         print("✉ [관리자 알림 전송 완료]")
-    except:
+    else:
         print("⚠ 관리자 알림 전송 실패")
 
 # ===[게시판 검사]===
@@ -118,74 +117,43 @@ def check_board(session, board_info, saved_data):
     
     try:
         # 1) 인터넷 접속 (timeout 30 변경)
-        response = session.get(url, headers=get_random_headers(), verify=False, timeout=30)
+        response = session.get(url, headers=page_cache.conditional_headers(url, get_random_headers(), board_id in saved_data), timeout=30)
+
+        # 2) 304(변경 없음)면 파싱 생략
+        if page_cache.is_unchanged(response):
+            print(f"☒ [{board_name}] 변경 없음 (캐시)")
+            return False
+
+        # 목록(tbody) 해시가 지난번과 같아도 파싱 생략
+        hash_key = f"{board_id}_hash"
+        unchanged, body_hash = page_cache.same_body(saved_data, hash_key, response)
+        if unchanged:
+            # 목록은 그대로여도 검증값(ETag 등)이 새로 왔으면 기록 (다음엔 304)
+            page_cache.remember(url, response)
+            print(f"☒ [{board_name}] 변경 없음 (해시)")
+            return False
         response.encoding = 'utf-8'
 
-        # 3) HTML 파싱
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # 3) 본 글 번호 목록 불러오기 (없으면 최초 실행)
+        seen = seen_ids.load(saved_data.get(board_id))
 
-        # 4) 게시글 줄(Row) 탐색
-        rows = soup.select('tbody > tr')
-        if not rows:
+        # 4) 각 줄(tr) 검사 (lxml 있으면 스트리밍 파싱), 이미 본 일반글이 이어지면 중단
+        rows = board_parser.iter_rows(response.content)
+        new_notices, row_count = board_parser.scan_new(rows, parse_row, seen)
+
+        # 5) 게시글 줄(Row) 없으면 구조 변경 의심
+        if not row_count:
             send_simple_error_log("게시글(tr)을 찾을 수 없음")
             raise Exception(f"⚠ [{board_name}] 게시글(tr)을 찾을 수 없음 (HTML 구조 변경 의심)")
 
-        # 5) 마지막으로 읽은 ID 불러오기
-        last_id = saved_data.get(board_id, 0)
-        
-        new_notices = []
-        max_id = last_id 
-
-        # 6) 각 줄(tr) 반복 검사
-        for row in rows:
-            title_td = row.select_one('td.title')
-            if not title_td: continue
-            
-            a_tag = title_td.select_one('a')
-            if not a_tag: continue
-
-            title = a_tag.get('title') or a_tag.text.strip()
-            href = a_tag.get('href')
-            
-            if href.startswith("?"):
-                link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
-            elif href.startswith("/"):
-                link = f"https://dorm.cnu.ac.kr{href}"
-            else:
-                link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
-
-            article_id = extract_id_from_link(link)
-            if article_id == 0: continue
-
-            is_top = False
-            num_td = row.select_one('td.num')
-            if num_td and "공지" in num_td.get_text():
-                is_top = True
-
-            if article_id > last_id:
-                new_notices.append({
-                    "id": article_id,
-                    "title": title,
-                    "link": link,
-                    "is_top": is_top
-                })
-                if article_id > max_id:
-                    max_id = article_id
-
-        # 7) 최초 실행 처리
-        if last_id == 0 and max_id > 0:
-            print(f"☐ [{board_name}] 최초 실행 - 기준점(ID: {max_id})만 설정합니다.")
-            saved_data[board_id] = max_id
-            return True
-
-       # 8) 새 글 전송
-        if new_notices:
-            new_notices.sort(key=lambda x: x['id'])
-            send_discord_batch_alert(board_name, new_notices)
-            saved_data[board_id] = max_id
-            return True
-            
-        return False
+        # 파싱 끝난 페이지 검증값/해시 기록
+        page_cache.remember(url, response)
+        saved_data[hash_key] = body_hash
+
+        # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+        board_alerts.handle_page(saved_data, seen, new_notices, "dorm", board_id, board_id,
+                                 board_name, f"### 🛌 [{board_name}] 새 글 {{count}}건\n\n", WEBHOOK_ENV, alert=send_simple_error_log)
+        return True
 
     except Exception as e:
         print(f"⚠ [{board_name}] 접속/파싱 실패: {e}")
@@ -198,31 +166,28 @@ def run_bot():
     print("\n" + "━" * 40)
     print(f"🤖 기숙사 공지봇 실행: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # 인증서 경고 끄기
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    
     try:
-        saved_data = {}
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                try: saved_data = json.load(f)
-                except: saved_data = {}
+        saved_data = state_store.load(DATA_FILE)
 
         session = get_session()
         any_changes = False
 
         for board in TARGET_BOARDS:
-            delay = random.uniform(2, 4)
-            time.sleep(delay)
+            rate_limiter.wait_for(board["url"])
             if check_board(session, board, saved_data):
                 any_changes = True
 
+        # 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 실행 때 재전송)
+        if board_alerts.apply_acked("dorm", saved_data, webhook_queue.flush(WEBHOOK_ENV)):
+            any_changes = True
+
         if any_changes:
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump(saved_data, f, ensure_ascii=False, indent=4)
+            state_store.save(DATA_FILE, saved_data)
             print("☑ 통합 데이터 파일 저장 완료.")
         else:
             print("☒ 변동 사항 없음.")
+        page_cache.save()
+        dedup.save()
 
     # 전체 로직 에러 처리
     except Exception as e:
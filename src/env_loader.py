@@ -0,0 +1,30 @@
+import os
+
+# ===[설정 영역]==========================
+# .env 파일 읽기 (로컬/서버용)
+# - GitHub Actions처럼 환경변수로 받는 곳에는 .env가 없으므로 python-dotenv를 import하지 않음
+# - 찾는 위치는 load_dotenv()와 같음: src 폴더부터 위로 올라가며 처음 나오는 .env
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ENV_NAME = ".env"
+# ==========================================
+
+
+def find_env_file(start=BASE_DIR):
+    path = start
+    while True:
+        candidate = os.path.join(path, ENV_NAME)
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def load():
+    """.env가 있으면 환경변수로 읽어들임 (이미 있는 환경변수는 덮어쓰지 않음), 읽은 파일 경로 반환"""
+    path = find_env_file()
+    if path:
+        from dotenv import load_dotenv
+        load_dotenv(path)
+    return path
@@ -0,0 +1,104 @@
+import random
+import threading
+
+import http_client
+
+# ===[설정 영역]==========================
+# 요청 헤더(User-Agent 포함) 묶음 관리
+# - fake_useragent 데이터는 처음 헤더가 필요할 때 한 번만 읽음 (import 시점에는 안 읽음)
+# - 호스트마다 브라우저 하나를 골라 프로세스가 끝날 때까지 같은 헤더 사용
+#   (요청마다 UA가 바뀌면 같은 연결/TLS 지문에서 브라우저가 계속 바뀌는 모양이 됨)
+# - 헤더는 브라우저 종류별로 실제 브라우저가 보내는 조합 그대로 (크롬 UA + 파이어폭스 Accept 같은 섞임 방지)
+FAMILIES = ["chrome", "edge", "firefox"]
+# curl_cffi(크롬 TLS 흉내)를 쓰는 호스트는 UA도 크롬으로 맞춤
+CURL_FAMILY = "chrome"
+# br(brotli)은 curl_cffi만 풀 수 있음 (requests는 brotli 패키지가 없으면 압축된 바이트를 그대로 돌려줌)
+CURL_ENCODING = "gzip, deflate, br"
+# fake_useragent가 없거나 읽기 실패하면 이 UA 사용
+FALLBACK_UA = {
+    "chrome": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "edge": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0",
+    "firefox": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0",
+}
+FAMILY_HEADERS = {
+    "chrome": {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    },
+    "edge": {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "ko,en;q=0.9,en-US;q=0.8",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    },
+    "firefox": {
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "ko-KR,ko;q=0.8,en-US;q=0.5,en;q=0.3",
+        "Connection": "keep-alive",
+        "Upgrade-Insecure-Requests": "1",
+    },
+}
+# ==========================================
+
+_ua = None            # fake_useragent.UserAgent (처음 쓸 때 생성, 실패하면 False)
+_profiles = {}        # 호스트 -> {"family", "headers"}
+_lock = threading.Lock()
+
+
+def _user_agent_db():
+    """fake_useragent 데이터 (프로세스당 한 번만 읽음)"""
+    global _ua
+    if _ua is None:
+        try:
+            from fake_useragent import UserAgent
+            try: _ua = UserAgent(platforms="desktop")
+            except TypeError: _ua = UserAgent()   # 1.x 버전은 platforms 인자 없음
+        except Exception as e:
+            print(f"⚠ User-Agent 데이터 읽기 실패 (기본 UA 사용): {e}")
+            _ua = False
+    return _ua
+
+
+def _pick_user_agent(family):
+    ua = _user_agent_db()
+    if ua:
+        try: return getattr(ua, family)
+        except Exception: pass
+    return FALLBACK_UA[family]
+
+
+def profile_for(url):
+    """호스트에 정해진 헤더 묶음 (처음 부를 때 브라우저를 고르고 이후에는 그대로)"""
+    host = http_client.get_host(url)
+    with _lock:
+        profile = _profiles.get(host)
+        if profile is None:
+            is_curl = http_client.profile_for(host)["backend"] == "curl"
+            family = CURL_FAMILY if is_curl else random.choice(FAMILIES)
+            headers = dict(FAMILY_HEADERS[family])
+            if is_curl:
+                headers["Accept-Encoding"] = CURL_ENCODING
+            headers["User-Agent"] = _pick_user_agent(family)
+            profile = {"family": family, "headers": headers}
+            _profiles[host] = profile
+        return profile
+
+
+def headers_for(url, referer=None):
+    """요청에 넣을 헤더 (호출마다 새 dict라 page_cache 등이 고쳐도 됨)"""
+    headers = dict(profile_for(url)["headers"])
+    if referer:
+        headers["Referer"] = referer
+    return headers
+
+
+def reset(url=None):
+    """골라둔 브라우저 잊기 (url 없으면 전부) -> 다음 요청 때 다시 고름"""
+    with _lock:
+        if url is None: _profiles.clear()
+        else: _profiles.pop(http_client.get_host(url), None)
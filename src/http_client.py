@@ -0,0 +1,88 @@
+import os
+import threading
+from urllib.parse import urlparse
+
+# ===[설정 영역]==========================
+# 모든 HTTP 요청(게시판 읽기, 디스코드 전송, 관리자 알림)이 쓰는 세션을 여기서 관리
+# - 호스트마다 세션 하나를 만들어 프로세스가 끝날 때까지 재사용 (연결/TLS 재사용)
+# - backend: "curl" = curl_cffi (impersonate로 크롬 TLS 흉내, HTTP/2) / "requests"
+# - verify: False면 인증서 확인 안 함 (학교 일부 사이트 인증서 문제)
+# - requests / curl_cffi는 그 백엔드 세션을 처음 만들 때 import (한 번 실행하고 끝나는 봇의 시작 시간 줄이기)
+IMPERSONATE = os.environ.get("HTTP_IMPERSONATE", "chrome120")
+HOST_PROFILES = {
+    "computer.cnu.ac.kr": {"backend": "curl", "verify": True},
+    "dorm.cnu.ac.kr": {"backend": "requests", "verify": False},
+    "library.cnu.ac.kr": {"backend": "requests", "verify": False},
+    "with.cnu.ac.kr": {"backend": "requests", "verify": True},
+    "discord.com": {"backend": "requests", "verify": True},
+}
+DEFAULT_PROFILE = {"backend": "requests", "verify": True}
+# 동시에 열어둘 연결 수 (with+ 페이지 동시 요청, 디스코드 여러 웹후크)
+POOL_SIZE = 4
+# ==========================================
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_host(url):
+    """URL이면 호스트만, 이미 호스트면 그대로"""
+    return urlparse(url).netloc or url
+
+
+def profile_for(url):
+    return HOST_PROFILES.get(get_host(url), DEFAULT_PROFILE)
+
+
+def _requests_session(profile):
+    """Retry(5xx) + 연결 풀 달린 requests 세션"""
+    import requests
+    import urllib3
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    if not profile["verify"]:
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504], allowed_methods=["GET", "HEAD"])
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.verify = profile["verify"]
+    return session
+
+
+def _curl_session(profile):
+    """브라우저 TLS 지문 흉내 + HTTP/2 (curl_cffi가 없으면 None -> requests로 대신)"""
+    try:
+        from curl_cffi import requests as curl_requests
+    except ImportError:
+        return None
+    return curl_requests.Session(impersonate=IMPERSONATE, verify=profile["verify"])
+
+
+def get_session(url):
+    """
+    호스트별 공용 세션 (처음 부를 때 만들고 이후에는 같은 세션 반환)
+    url: 요청할 URL 또는 호스트
+    """
+    host = get_host(url)
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            profile = profile_for(host)
+            if profile["backend"] == "curl":
+                session = _curl_session(profile)
+            if session is None:
+                session = _requests_session(profile)
+            _sessions[host] = session
+        return session
+
+
+def close_all():
+    """열린 세션 모두 닫기 (데몬 종료 시)"""
+    with _lock:
+        for session in _sessions.values():
+            try: session.close()
+            except: pass
+        _sessions.clear()
@@ -1,20 +1,26 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback 
-import random
-from fake_useragent import UserAgent
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
-load_dotenv()
+import env_loader
+env_loader.load()
+
+import http_client
+import header_profile
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
 
 # ===[설정 영역]==========================
-DISCORD_WEBHOOK_URL = os.environ.get("library_WEBHOOK_URL")
+# 전송은 webhook_queue가 이 환경변수에서 URL을 읽어서 처리
+WEBHOOK_ENV = "library_WEBHOOK_URL"
+# 본 글 목록 키("seen") -> 기록 DB/중복 확인에 쓰는 게시판 이름
+ARCHIVE_BOARDS = {"seen": "general"}
 # 관리자 에러 알림용 웹후크
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 URL = "https://library.cnu.ac.kr/bbs/list/1"
@@ -22,28 +28,16 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "..", "data", "library_data.json")
 # ==========================================
 
-# ===[랜덤 헤더 생성기]===
+# ===[헤더 생성기]===
 # 차단 방지2
 def get_random_headers():
-    ua = UserAgent()
-    return {
-        'User-Agent': ua.random,
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive',
-        'Referer': 'https://library.cnu.ac.kr/',
-        'Upgrade-Insecure-Requests': '1'
-    }
+    """호스트마다 고정된 브라우저 헤더 (UA 데이터는 처음 한 번만 읽음, header_profile)"""
+    return header_profile.headers_for(URL, referer='https://library.cnu.ac.kr/')
 
 # ===[세션 생성기]===
 def get_session():
-    """Retry 가능한 세션 생성"""
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(URL)
 
 # ===[ID 추출기]===
 def extract_id_from_link(link):
@@ -59,31 +53,27 @@ def extract_id_from_link(link):
         
     return 0
 
-# ===[디코 전송기]===
-def send_discord_message(new_notices):
-    """학생용 공지 알림 전송"""
-    if not new_notices: return
-
-    if not DISCORD_WEBHOOK_URL:
-        print("⚠ 웹후크 URL이 없음")
-        send_simple_error_log("웹후크 URL이 없음")
-        return
+# ===[행 파싱]===
+def parse_row(row):
+    """정규화된 줄(board_parser) -> 공지 dict (게시글 줄이 아니면 None)"""
+    a_tag = board_parser.find_link(row, cell="title") or board_parser.find_link(row, cell="subject") or board_parser.find_link(row)
+    if not a_tag: return None
 
-    count = len(new_notices)
-    message_content = f"### :books: [일반공지] 새 글 {count}건\n\n"
+    title = a_tag['title'] or a_tag['text'].strip()
+    title = title.replace("새글", "").strip()
     
-    for notice in new_notices:
-        title = notice['title']
-        link = notice['link']
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{title}](<{link}>)\n"
+    href = a_tag['href']
+    link = f"https://library.cnu.ac.kr{href}"
+    
+    article_id = extract_id_from_link(link)
+    if article_id == 0: return None
 
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content})
-        print(f"✉ [전송 완료] 도서관 공지 {count}건")
-    except Exception as e:
-        send_simple_error_log("공지 전송 실패")
-        print(f"⚠ [전송 실패] {e}")
+    return {
+        "id": article_id,
+        "title": title,
+        "link": link,
+        "is_top": 'always' in row['classes']
+    }
 
 # 관리자 심플 알림 함수
 def send_simple_error_log(error_msg=None):
@@ -100,95 +90,87 @@ def send_simple_error_log(error_msg=None):
     else:
         content = f"🚨 **[도서관 봇 오류]** \n{now}"
     
-    try:
-        requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
+    if webhook_queue.send_now(MONITOR_WEBHOOK_URL, content):
         print("✉ [관리자 알림 전송 완료]")
-    except:
+    else:
         print("⚠ 관리자 알림 전송 실패")
 
+# ===[게시판 검사]===
+def check_library_notices(session, saved_data):
+    """
+    새 글 있으면 전송 후 True 반환 (saved_data 갱신)
+    실패 시: Exception 발생 (상위에서 처리)
+    """
+    # 본 글 번호 목록 (예전 형식 last_id도 읽음, 없으면 최초 실행)
+    seen = seen_ids.load(saved_data.get("seen", saved_data.get("last_id")))
+
+    # 1. 웹페이지 접속 (호스트별 고정 헤더 넣기)
+    current_headers = page_cache.conditional_headers(URL, get_random_headers(), seen is not None)
+    response = session.get(URL, headers=current_headers, timeout=30)
+
+    # 304(변경 없음)면 파싱 생략
+    if page_cache.is_unchanged(response):
+        print("☒ [도서관] 변경 없음 (캐시)")
+        return False
+
+    # 목록(tbody) 해시가 지난번과 같아도 파싱 생략
+    unchanged, body_hash = page_cache.same_body(saved_data, "last_hash", response)
+    if unchanged:
+        # 목록은 그대로여도 검증값(ETag 등)이 새로 왔으면 기록 (다음엔 304)
+        page_cache.remember(URL, response)
+        print("☒ [도서관] 변경 없음 (해시)")
+        return False
+    
+    response.encoding = 'utf-8'
+
+    # 2. 각 줄 검사 (lxml 있으면 스트리밍 파싱), 이미 본 일반글이 이어지면 중단
+    rows = board_parser.iter_rows(response.content)
+    new_notices, row_count = board_parser.scan_new(rows, parse_row, seen)
+
+    # 3. 게시글 줄(Row)이 하나도 없으면
+    if not row_count:
+        # 게시글을 못 찾은 것도 에러 상황일 수 있으므로 예외 발생
+        send_simple_error_log("게시글(tr)을 찾을 수 없음")
+        raise Exception("⚠ [도서관 일반공지] 게시글(tr)을 찾을 수 없음 (HTML 구조 변경 의심)")
+
+    # 파싱 끝난 페이지 검증값/해시 기록
+    page_cache.remember(URL, response)
+    saved_data["last_hash"] = body_hash
+
+    # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+    board_alerts.handle_page(saved_data, seen, new_notices, "library", "general", "seen",
+                             "도서관", "### :books: [일반공지] 새 글 {count}건\n\n", WEBHOOK_ENV, alert=send_simple_error_log)
+    saved_data.pop("last_id", None)
+    return True
+
 # ===[MAIN]===
-def check_library_notices():
+def run_bot():
     print("\n" + "━" * 40)
     print(f"🤖 도서관 공지봇 실행: {time.strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
         # 1. 기존 데이터 파일 읽기
-        saved_data = {}
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r", encoding="utf-8") as f:
-                try: saved_data = json.load(f)
-                except: saved_data = {}
-        
-        last_id = saved_data.get("last_id", 0)
+        saved_data = state_store.load(DATA_FILE)
 
-        # 2. 웹페이지 접속
+        # 2. 접속 전 대기 (호스트 예산만큼만)
         session = get_session()
-        sleep_time = random.uniform(2, 5)
-        print(f"⏳ 도서관 접속 전 {sleep_time:.1f}초 대기...")
-        time.sleep(sleep_time)
-        
-        # 랜덤 헤더 생성해서 넣기
-        current_headers = get_random_headers()
-        response = session.get(URL, headers=current_headers, verify=False, timeout=30)
-        
-        response.encoding = 'utf-8'
-
-        # 3. HTML 파싱
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # 4. 게시글 줄(Row) 탐색
-        rows = soup.select('tbody > tr')
-        if not rows:
-            # 게시글을 못 찾은 것도 에러 상황일 수 있으므로 예외 발생
-            send_simple_error_log("게시글(tr)을 찾을 수 없음")
-            raise Exception("⚠ [도서관 일반공지] 게시글(tr)을 찾을 수 없음 (HTML 구조 변경 의심)")
-
-        new_notices = []
-        max_id_in_this_scan = last_id
-
-        # 5. 각 줄 반복 검사
-        for row in rows:
-            a_tag = row.select_one('td.title a') or row.select_one('td.subject a') or row.select_one('a')
-            if not a_tag: continue
-
-            title = a_tag.get('title') or a_tag.text.strip()
-            title = title.replace("새글", "").strip()
-            
-            href = a_tag.get('href')
-            link = f"https://library.cnu.ac.kr{href}"
-            
-            article_id = extract_id_from_link(link)
-            if article_id == 0: continue
-
-            is_top = 'always' in row.get('class', [])
-
-            if article_id > last_id:
-                new_notices.append({
-                    "id": article_id,
-                    "title": title,
-                    "link": link,
-                    "is_top": is_top
-                })
-                if article_id > max_id_in_this_scan:
-                    max_id_in_this_scan = article_id
-
-        # 6. 최초 실행 처리
-        if last_id == 0 and max_id_in_this_scan > 0:
-            print(f"☐ [도서관] 최초 실행 - 기준점(ID: {max_id_in_this_scan})만 설정")
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump({"last_id": max_id_in_this_scan}, f, indent=4)
-            return
-
-        # 7. 새 글 전송 및 저장
-        if new_notices:
-            new_notices.sort(key=lambda x: x['id'])
-            send_discord_message(new_notices)
-            
-            with open(DATA_FILE, "w", encoding="utf-8") as f:
-                json.dump({"last_id": max_id_in_this_scan}, f, indent=4)
+        rate_limiter.wait_for(URL)
+
+        # 3. 검사
+        any_changes = check_library_notices(session, saved_data)
+
+        # 4. 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 실행 때 재전송)
+        if board_alerts.apply_acked("library", saved_data, webhook_queue.flush(WEBHOOK_ENV), ARCHIVE_BOARDS):
+            any_changes = True
+
+        # 5. 저장
+        if any_changes:
+            state_store.save(DATA_FILE, saved_data)
             print("☑ 도서관 데이터 저장 완료")
         else:
             print("☒ 도서관 새 소식 없음")
+        page_cache.save()
+        dedup.save()
 
     # 에러 발생 시 처리
     except Exception as e:
@@ -197,5 +179,4 @@ def check_library_notices():
         send_simple_error_log(f"프로그램 강제 종료\n{str(e)}") # 상세 에러 내용 전송
 
 if __name__ == "__main__":
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    check_library_notices()
+    run_bot()
@@ -0,0 +1,183 @@
+import os
+
+# ===[설정 영역]==========================
+# 메시지 모양: content(일반 글) / embed(임베드 카드)
+STYLE = os.environ.get("DISCORD_MESSAGE_STYLE", "content")
+EMBED_COLOR = 0x1E64C8
+
+# 디스코드 제한 (글자 수 = 유니코드 문자 단위, 바이트 아님)
+MAX_CONTENT = 2000        # content
+MAX_EMBEDS = 10           # 메시지 하나당 임베드 수
+MAX_EMBED_TOTAL = 6000    # 메시지 하나의 임베드 글자 합계
+MAX_TITLE = 256
+MAX_DESCRIPTION = 4096
+# 여러 메시지로 나뉠 때 제목줄에 붙는 " (i/n)" 자리
+PART_MARK = 10
+# ==========================================
+
+# 메시지(payload)는 웹후크에 그대로 보내는 dict
+#   {"content": "..."} 또는 {"embeds": [{"title", "description", ...}, ...]}
+
+
+# ===[크기]===
+def text_size(text):
+    """디스코드가 세는 단위 (파이썬 문자열 길이 = 코드포인트)"""
+    return len(text or "")
+
+
+def embed_size(embed):
+    """임베드 글자 합계 (title/description/footer/author/fields)"""
+    size = text_size(embed.get("title")) + text_size(embed.get("description"))
+    size += text_size((embed.get("footer") or {}).get("text"))
+    size += text_size((embed.get("author") or {}).get("name"))
+    for field in embed.get("fields", []):
+        size += text_size(field.get("name")) + text_size(field.get("value"))
+    return size
+
+
+def payload_size(payload):
+    if "embeds" in payload:
+        return sum(embed_size(e) for e in payload["embeds"])
+    return text_size(payload.get("content"))
+
+
+# ===[빈 패킹]===
+def pack(sizes, limit, counts=None, max_count=None):
+    """
+    순서대로 채우기: 지금 묶음에 안 들어가면 새 묶음 시작 -> 글 순서가 메시지 안/메시지끼리 그대로 유지됨
+    (연속으로 나누는 경우에는 이게 최소 묶음 수)
+    counts/max_count: 크기 말고 개수 제한도 있을 때 (임베드 10개)
+    반환: 인덱스 묶음 목록
+    """
+    counts = counts or [1] * len(sizes)
+    groups = []
+    room, count_room = -1, -1
+    for i, size in enumerate(sizes):
+        if not groups or size > room or (max_count is not None and counts[i] > count_room):
+            groups.append([])
+            room, count_room = limit, (max_count or 0)
+        groups[-1].append(i)
+        room -= size
+        count_room -= counts[i]
+    return groups
+
+
+def split_text(text, limit=MAX_CONTENT):
+    """limit 넘는 글은 줄 단위로 자름 (한 줄이 넘으면 강제로 자름)"""
+    if text_size(text) <= limit:
+        return [text]
+    parts, current = [], ""
+    for line in text.splitlines(keepends=True):
+        while len(line) > limit:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(line[:limit])
+            line = line[limit:]
+        if len(current) + len(line) > limit:
+            parts.append(current)
+            current = ""
+        current += line
+    if current:
+        parts.append(current)
+    return parts
+
+
+# ===[메시지 만들기]===
+def build(header, blocks, refs=None, style=None):
+    """
+    제목줄 + 글 목록(blocks, 한 글당 한 덩어리)을 디스코드 제한에 맞게 나눔
+    refs: blocks와 같은 순서의 글 표시 -> 메시지마다 담긴 글의 refs를 같이 돌려줌
+    반환: [(payload, refs), ...]
+    """
+    refs = refs or [None] * len(blocks)
+    if (style or STYLE) == "embed":
+        return _build_embeds(header, blocks, refs)
+    return _build_content(header, blocks, refs)
+
+
+def part_header(header, index, total):
+    """여러 메시지로 나뉘면 제목줄 첫 줄 끝에 (i/n) 표시"""
+    if total <= 1: return header
+    first, sep, rest = header.partition("\n")
+    return f"{first} ({index}/{total}){sep}{rest}"
+
+
+def _build_content(header, blocks, refs):
+    # 메시지마다 제목줄 + (i/n)을 붙이므로 그만큼 빼고 패킹
+    room = MAX_CONTENT - text_size(header) - PART_MARK
+    pieces, piece_refs = [], []
+    for block, ref in zip(blocks, refs):
+        for part in split_text(block, room):
+            pieces.append(part)
+            piece_refs.append(ref)
+
+    groups = pack([text_size(p) for p in pieces], room)
+    messages = []
+    for n, group in enumerate(groups, 1):
+        content = part_header(header, n, len(groups)) + "".join(pieces[i] for i in group)
+        messages.append(({"content": content}, _refs_of(group, piece_refs)))
+    return messages
+
+
+def _build_embeds(header, blocks, refs):
+    title = header.lstrip("#").strip()[:MAX_TITLE - PART_MARK]
+    lines = [block.strip("\n")[:MAX_DESCRIPTION - 1] + "\n" for block in blocks]
+
+    # 1) 글 -> 임베드 (설명 4096자 이내, 여러 개면 제목에 (i/n))
+    room = min(MAX_DESCRIPTION, MAX_EMBED_TOTAL - text_size(title) - PART_MARK)
+    groups = pack([text_size(line) for line in lines], room)
+    embeds = []
+    for n, group in enumerate(groups, 1):
+        embed = {"title": part_header(title, n, len(groups)), "description": "".join(lines[i] for i in group),
+                 "color": EMBED_COLOR}
+        embeds.append((embed, _refs_of(group, refs)))
+
+    # 2) 임베드 -> 메시지 (10개 / 6000자 이내)
+    messages = []
+    sizes = [embed_size(e) for e, _ in embeds]
+    for group in pack(sizes, MAX_EMBED_TOTAL, max_count=MAX_EMBEDS):
+        payload = {"embeds": [embeds[i][0] for i in group]}
+        messages.append((payload, [r for i in group for r in embeds[i][1]]))
+    return messages
+
+
+def _refs_of(group, refs):
+    seen, result = set(), []
+    for i in group:
+        if refs[i] is not None and refs[i] not in seen:
+            seen.add(refs[i])
+            result.append(refs[i])
+    return result
+
+
+# ===[대기열 합치기]===
+def merge(payloads):
+    """
+    같은 웹후크로 갈 메시지 여러 개를 제한 안에서 합침 (webhook_queue.flush)
+    들어온 순서 그대로 채우고, content/임베드가 바뀌거나 안 들어가면 다음 메시지로
+    반환: [(합친 원래 인덱스 목록, payload), ...] - 원래 순서
+    """
+    runs = []  # [(임베드 여부, 인덱스 목록)] - 같은 종류가 이어지는 구간
+    for i, payload in enumerate(payloads):
+        is_embed = "embeds" in payload
+        if not runs or runs[-1][0] != is_embed:
+            runs.append((is_embed, []))
+        runs[-1][1].append(i)
+
+    merged = []
+    for is_embed, run in runs:
+        if is_embed:
+            sizes = [payload_size(payloads[i]) for i in run]
+            counts = [len(payloads[i]["embeds"]) for i in run]
+            for group in pack(sizes, MAX_EMBED_TOTAL, counts=counts, max_count=MAX_EMBEDS):
+                indices = [run[g] for g in group]
+                merged.append((indices, {"embeds": [e for i in indices for e in payloads[i]["embeds"]]}))
+        else:
+            # 사이에 빈 줄(2자)을 넣으므로 2자씩 더해서 패킹
+            sizes = [text_size(payloads[i]["content"].strip("\n")) + 2 for i in run]
+            for group in pack(sizes, MAX_CONTENT + 2):
+                indices = [run[g] for g in group]
+                content = "\n\n".join(payloads[i]["content"].strip("\n") for i in indices)
+                merged.append((indices, {"content": content}))
+    return merged
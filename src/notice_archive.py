@@ -0,0 +1,158 @@
+import os
+import time
+import sqlite3
+import threading
+
+import dedup
+
+# ===[설정 영역]==========================
+# 공지 기록 DB (선택 기능)
+# NOTICE_DB 환경변수에 파일 경로를 넣으면 켜짐 (비어 있으면 아무것도 안 함)
+#   예) NOTICE_DB=data/notices.db
+DB_FILE = os.environ.get("NOTICE_DB")
+# 다른 봇 프로세스가 쓰는 중이면 이만큼(ms) 기다림
+BUSY_TIMEOUT = 5000
+# ==========================================
+
+_conn = None
+_lock = threading.Lock()
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notices (
+    source      TEXT    NOT NULL,   -- 봇 (cse / dorm / library)
+    board       TEXT    NOT NULL,   -- 게시판 id (bachelor, notice, seen ...)
+    article_id  INTEGER NOT NULL,
+    title       TEXT,
+    title_key   TEXT,               -- 비교용 제목 해시 (dedup.title_key와 같음)
+    link        TEXT,
+    is_top      INTEGER NOT NULL DEFAULT 0,
+    first_seen  INTEGER NOT NULL,   -- 처음 본 시각 (unix)
+    sent_at     INTEGER,            -- 디스코드 전송 확인 시각 (안 보냈거나 아직 대기 중이면 NULL)
+    PRIMARY KEY (source, board, article_id)
+);
+CREATE INDEX IF NOT EXISTS idx_notices_first_seen ON notices (first_seen);
+CREATE INDEX IF NOT EXISTS idx_notices_title ON notices (title);
+"""
+# title_key 없던 예전 DB에 열 추가 후 만드는 인덱스
+TITLE_KEY_INDEX = "CREATE INDEX IF NOT EXISTS idx_notices_title_key ON notices (title_key)"
+
+# 이미 있는 글이면 처음 본 시각/전송 시각은 유지하고 제목/링크만 갱신
+UPSERT = """
+INSERT INTO notices (source, board, article_id, title, title_key, link, is_top, first_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, board, article_id) DO UPDATE SET
+    title = excluded.title,
+    title_key = excluded.title_key,
+    link = excluded.link,
+    is_top = excluded.is_top
+"""
+
+# 전송 확인(webhook_queue.flush)된 글만, 처음 확인된 시각으로
+MARK_SENT = """
+UPDATE notices SET sent_at = COALESCE(sent_at, ?)
+WHERE source = ? AND board = ? AND article_id = ?
+"""
+
+
+def enabled():
+    return bool(DB_FILE)
+
+
+def _connect():
+    """DB 연결은 처음 쓸 때 한 번만 (스케줄러 스레드끼리 공유, _lock으로 보호)"""
+    global _conn
+    if _conn is None:
+        directory = os.path.dirname(os.path.abspath(DB_FILE))
+        os.makedirs(directory, exist_ok=True)
+        _conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT / 1000, check_same_thread=False)
+        _conn.row_factory = sqlite3.Row
+        # WAL: 데몬 봇이 쓰는 동안에도 다른 봇이 읽기 가능
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+        _conn.executescript(SCHEMA)
+        columns = [row["name"] for row in _conn.execute("PRAGMA table_info(notices)")]
+        if "title_key" not in columns:
+            _conn.execute("ALTER TABLE notices ADD COLUMN title_key TEXT")
+        _conn.execute(TITLE_KEY_INDEX)
+    return _conn
+
+
+# ===[기록]===
+def _run(sql, rows):
+    """기록 실패는 봇 동작에 영향 없도록 경고만 출력"""
+    try:
+        with _lock:
+            conn = _connect()
+            with conn:
+                conn.executemany(sql, rows)
+    except Exception as e:
+        print(f"⚠ 공지 기록 DB 저장 실패: {e}")
+
+
+def archive(source, board, notices, now=None):
+    """한 페이지에서 찾은 글(대기 중/중복 생략 포함)을 한 번에 기록 (트랜잭션 1번)"""
+    if not enabled() or not notices: return
+    now = int(now or time.time())
+    _run(UPSERT, [
+        (source, board, n["id"], n.get("title"), dedup.title_key(n.get("title")), n.get("link"),
+         int(bool(n.get("is_top"))), now)
+        for n in notices
+    ])
+
+
+def mark_sent(source, board, article_ids, now=None):
+    """디스코드 전송이 확인된 글에 전송 시각 기록"""
+    if not enabled() or not article_ids: return
+    now = int(now or time.time())
+    _run(MARK_SENT, [(now, source, board, int(article_id)) for article_id in article_ids])
+
+
+# ===[조회]===
+def find_by_title(title, since=None):
+    """같은 제목으로 기록된 글 (다른 게시판/봇 포함, 비교는 dedup과 같은 정규화 제목)"""
+    if not enabled(): return []
+    query = "SELECT * FROM notices WHERE title_key = ?"
+    params = [dedup.title_key(title)]
+    if since is not None:
+        query += " AND first_seen >= ?"
+        params.append(int(since))
+    with _lock:
+        return [dict(row) for row in _connect().execute(query, params)]
+
+
+def sent_since(since, source=None):
+    """since(unix) 이후에 전송 확인된 글 (최근 순)"""
+    if not enabled(): return []
+    query = "SELECT * FROM notices WHERE sent_at >= ?"
+    params = [int(since)]
+    if source:
+        query += " AND source = ?"
+        params.append(source)
+    query += " ORDER BY sent_at DESC"
+    with _lock:
+        return [dict(row) for row in _connect().execute(query, params)]
+
+
+# ===[조회 명령]===
+#   NOTICE_DB=data/notices.db python src/notice_archive.py --days 7 [--source cse]
+#   NOTICE_DB=data/notices.db python src/notice_archive.py --title "2학기 수강신청 안내"
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="공지 기록 DB 조회")
+    parser.add_argument("--days", type=float, default=7, help="최근 며칠 동안 전송한 글 (기본 7일)")
+    parser.add_argument("--source", help="봇 (cse / dorm / library)")
+    parser.add_argument("--title", help="이 제목이 올라온 게시판 찾기")
+    args = parser.parse_args()
+
+    if not enabled():
+        parser.error("NOTICE_DB 환경변수가 비어 있음")
+    if args.title:
+        rows = find_by_title(args.title)
+    else:
+        rows = sent_since(time.time() - args.days * 24 * 3600, args.source)
+    for row in rows:
+        sent = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["sent_at"])) if row["sent_at"] else "미전송"
+        print(f"[{row['source']}/{row['board']}] {row['article_id']} {row['title']} ({sent})")
+    print(f"총 {len(rows)}건")
@@ -0,0 +1,97 @@
+import os
+import hashlib
+import threading
+
+import state_store
+
+# ===[설정 영역]==========================
+# 게시판 URL -> {"etag", "last_modified"}
+# (tbody 해시는 각 봇 데이터 파일의 last_id 옆에 "<게시판>_hash"로 저장)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_FILE = os.path.join(BASE_DIR, "..", "data", "http_cache.json")
+# ==========================================
+
+_cache = None
+_dirty = False
+_lock = threading.Lock()
+
+
+def _load():
+    """캐시 파일은 처음 쓸 때 한 번만 읽음"""
+    global _cache
+    if _cache is None:
+        _cache = state_store.load(CACHE_FILE)
+    return _cache
+
+
+# ===[tbody 구간]===
+def tbody_bytes(content):
+    """응답 바이트 중 <tbody> ~ </tbody> 구간만 잘라냄 (없으면 전체)"""
+    start = content.find(b"<tbody")
+    end = content.rfind(b"</tbody>")
+    if start != -1 and end > start:
+        return content[start:end]
+    return content
+
+
+def tbody_hash(content):
+    """tbody 구간만 해시 (광고/시간 등 바깥 영역 무시)"""
+    return hashlib.blake2b(tbody_bytes(content), digest_size=16).hexdigest()
+
+
+# ===[조건부 요청]===
+def conditional_headers(url, headers, known=True):
+    """
+    기존 헤더에 If-None-Match / If-Modified-Since 추가
+    known: 이 게시판의 본 글 기록이 있는지 - 없으면(최초 실행/데이터 파일 초기화) 검증값을 보내지 않음
+    (304를 받으면 파싱을 안 해서 페이지가 바뀔 때까지 기준점을 못 잡음)
+    """
+    if not known: return dict(headers)
+    entry = _load().get(url, {})
+    merged = dict(headers)
+    if entry.get("etag"):
+        merged["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        merged["If-Modified-Since"] = entry["last_modified"]
+    return merged
+
+
+def is_unchanged(response):
+    """304면 변경 없음"""
+    return response.status_code == 304
+
+
+def same_body(saved_data, hash_key, response):
+    """
+    조건부 요청을 무시하는 서버용 사전 검사
+    tbody 해시가 저장된 값과 같으면 (True, 해시) -> 파싱 생략
+    (이때도 응답의 새 검증값은 remember()로 기록해야 다음 요청이 304를 받음)
+    """
+    body_hash = tbody_hash(response.content)
+    return saved_data.get(hash_key) == body_hash, body_hash
+
+
+def remember(url, response):
+    """파싱까지 끝났거나 지난번과 목록이 같은 응답의 검증값 저장 (save() 호출 시 파일에 기록)"""
+    global _dirty
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+
+    if not etag and not last_modified: return
+
+    entry = {}
+    if etag: entry["etag"] = etag
+    if last_modified: entry["last_modified"] = last_modified
+
+    with _lock:
+        _load()[url] = entry
+        _dirty = True
+
+
+def save():
+    """변경된 경우에만 캐시 파일 저장"""
+    global _dirty
+    with _lock:
+        if not _dirty: return
+        state_store.save(CACHE_FILE, _cache)
+        _dirty = False
@@ -1,17 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback
-import random
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
+import env_loader
 
-load_dotenv()
+import http_client
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
+
+env_loader.load()
 
 # ===[설정 영역]==========================
 # 30분 주기로 바꿈
@@ -21,7 +24,7 @@ CHECK_INTERVAL = 1800
 MAX_RETRIES = 3
 RETRY_DELAY = 60
 
-DISCORD_WEBHOOK_URL = os.environ.get("cse_WEBHOOK_URL")
+WEBHOOK_ENV = "cse_WEBHOOK_URL"
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 
 # 데이터 파일 경로
@@ -30,6 +33,8 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 DATA_FILE = os.path.join(DATA_DIR, "cse_data.json")
+# 전송 대기열/중복 확인 파일도 이 폴더에 (한 번 실행 봇과 따로)
+state_store.use_data_dir(DATA_DIR)
 
 # 게시판 목록
 TARGET_BOARDS = [
@@ -48,13 +53,8 @@ HEADERS = {
 
 # ===[세션 생성기]===
 def get_session():
-    """Network Level 재시도 세션"""
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(TARGET_BOARDS[0]["url"])
 
 # ===[ID 추출기]===
 def extract_article_id(link):
@@ -62,22 +62,26 @@ def extract_article_id(link):
     if match: return int(match.group(1))
     return 0
 
-# ===[디코 전송기]===
-def send_discord_batch_alert(category_name, new_notices):
-    if not new_notices or not DISCORD_WEBHOOK_URL: return
+# ===[행 파싱]===
+def parse_row(row, url):
+    title_div = board_parser.find_link(row, parent="b-title-box")
+    if not title_div: return None
 
-    count = len(new_notices)
-    message_content = f"### 📢 [{category_name}] 새 글 {count}건\n\n"
+    title = title_div['title'] or title_div['text'].strip()
+    title = title.replace("자세히 보기", "").strip()
 
-    for notice in new_notices:
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{notice['title']}](<{notice['link']}>)\n"
+    href = title_div['href']
+    if href.startswith('?'):
+        base_url = url.split('?')[0]
+        link = f"{base_url}{href}"
+    else:
+        link = href
 
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content}, timeout=5)
-        print(f"✉ [전송 완료] {category_name} - {count}건")
-    except Exception as e:
-        print(f"⚠ [전송 실패] {e}")
+    article_id = extract_article_id(link)
+    if article_id == 0: return None
+
+    is_top = 'b-top-box' in row['classes']
+    return {"id": article_id, "title": title, "link": link, "is_top": is_top}
 
 # ===[관리자 알림 함수]===
 def send_simple_error_log(error_msg=None, is_fatal=False):
@@ -93,8 +97,7 @@ def send_simple_error_log(error_msg=None, is_fatal=False):
     if error_msg: content += f"에러: ```{error_msg}```"
     if is_fatal: content += "\n> 📢 **모든 재시도 실패. 봇 점검이 필요합니다.**"
 
-    try: requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
-    except: pass
+    webhook_queue.send_now(MONITOR_WEBHOOK_URL, content)
 
 # ===[게시판 검사]===
 def check_board(session, board_info, saved_data):
@@ -108,80 +111,48 @@ def check_board(session, board_info, saved_data):
 
     print(f"● [{board_name}] 분석 중...")
 
-    # [enw] 차단 방지 ~ 재시도 할때도 적용됨
-    time.sleep(random.uniform(5, 10))
+    # [enw] 차단 방지 ~ 재시도 할때도 적용됨 (호스트별 토큰 버킷)
+    rate_limiter.wait_for(url)
 
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    response = session.get(url, headers=HEADERS, verify=False, timeout=30)
-    response.encoding = 'utf-8'
+    response = session.get(url, headers=HEADERS, timeout=30)
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    rows = soup.select('table.board-table tbody tr')
+    # 목록(tbody) 해시가 지난번과 같으면 파싱 생략 (짧은 주기 폴링용)
+    hash_key = f"{board_id}_hash"
+    unchanged, body_hash = page_cache.same_body(saved_data, hash_key, response)
+    if unchanged:
+        print(f"☒ [{board_name}] 변경 없음 (해시)")
+        return False
 
-    if not rows:
+    response.encoding = 'utf-8'
+
+    # 고정글은 전부, 일반글은 이미 본 글이 이어질 때까지만 읽음 (본 글 목록 없으면 최초 실행)
+    seen = seen_ids.load(saved_data.get(board_id))
+    rows = board_parser.iter_rows(response.content)
+    new_notices, row_count = board_parser.scan_new(rows, lambda row: parse_row(row, url), seen)
+    
+    if not row_count:
         # 재시도 던지기
         raise Exception(f"게시글(tr) 없음 - HTML 구조 변경 또는 차단 의심")
 
-    last_id = saved_data.get(board_id, 0)
-    new_notices = []
-    max_id = last_id
-
-    for row in rows:
-        title_div = row.select_one('.b-title-box > a')
-        if not title_div: continue
-
-        title = title_div.get('title') or title_div.text.strip()
-        title = title.replace("자세히 보기", "").strip()
+    saved_data[hash_key] = body_hash
 
-        href = title_div.get('href')
-        if href.startswith('?'):
-            base_url = url.split('?')[0]
-            link = f"{base_url}{href}"
-        else:
-            link = href
-
-        article_id = extract_article_id(link)
-        if article_id == 0: continue
-
-        row_classes = row.get('class', [])
-        is_top = 'b-top-box' in row_classes
-
-        if article_id > last_id:
-            new_notices.append({
-                "id": article_id, "title": title, "link": link, "is_top": is_top
-            })
-            if article_id > max_id: max_id = article_id
-
-    # 최초 실행
-    if last_id == 0 and max_id > 0:
-        print(f"☐ [{board_name}] 최초 실행 - 기준점(ID: {max_id})만 설정")
-        saved_data[board_id] = max_id
-        return True
-
-    # 새 글 전송
-    if new_notices:
-        new_notices.sort(key=lambda x: x['id'])
-        send_discord_batch_alert(board_name, new_notices)
-        saved_data[board_id] = max_id
-        return True
-
-    return False
+    # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+    board_alerts.handle_page(saved_data, seen, new_notices, "cse", board_id, board_id,
+                             board_name, f"### 📢 [{board_name}] 새 글 {{count}}건\n\n", WEBHOOK_ENV)
+    return True
 
 # ===[MAIN]===
 def run_bot():
     print(f"🚀 CSE 공지봇 시작 (주기: {CHECK_INTERVAL}초, 재시도: {MAX_RETRIES}회)")
 
+    # 데이터 파일은 시작할 때 한 번만 읽고 이후에는 메모리에서 갱신
+    saved_data = state_store.load(DATA_FILE)
+
     try:
         while True:
             print("\n" + "━" * 40)
             print(f"⏰ 검사 시작: {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-            saved_data = {}
-            if os.path.exists(DATA_FILE):
-                try:
-                    with open(DATA_FILE, "r", encoding="utf-8") as f: saved_data = json.load(f)
-                except: pass
-
             session = get_session()
             any_changes = False
 
@@ -205,13 +176,17 @@ def run_bot():
                 if not board_success:
                     send_simple_error_log(f"[{board['name']}] 3회 접속 실패", is_fatal=True)
 
+            # 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 주기에 재전송)
+            if board_alerts.apply_acked("cse", saved_data, webhook_queue.flush(WEBHOOK_ENV)):
+                any_changes = True
+
             if any_changes:
-                with open(DATA_FILE, "w", encoding="utf-8") as f:
-                    json.dump(saved_data, f, ensure_ascii=False, indent=4)
+                state_store.save(DATA_FILE, saved_data)
                 print("☑ 데이터 저장 완료")
             else:
                 print("☒ 변동 사항 없음")
 
+            dedup.save()
             print(f"💤 {CHECK_INTERVAL}초 대기 중...")
             time.sleep(CHECK_INTERVAL)
 
@@ -220,6 +195,8 @@ def run_bot():
     except Exception as e:
         print(f"⚠ 치명적 오류: {e}")
         send_simple_error_log(f"메인 루프 종료됨\n{e}", is_fatal=True)
+    finally:
+        http_client.close_all()
 
 if __name__ == "__main__":
     run_bot()
\ No newline at end of file
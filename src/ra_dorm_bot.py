@@ -1,17 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback
-import random
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
+import env_loader
 
-load_dotenv()
+import http_client
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
+
+env_loader.load()
 
 # ===[설정 영역]==========================
 CHECK_INTERVAL = 1800
@@ -20,7 +23,7 @@ CHECK_INTERVAL = 1800
 MAX_RETRIES = 3
 RETRY_DELAY = 60
 
-DISCORD_WEBHOOK_URL = os.environ.get("dorm_WEBHOOK_URL")
+WEBHOOK_ENV = "dorm_WEBHOOK_URL"
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 
 # 경로 설정
@@ -29,6 +32,8 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 DATA_FILE = os.path.join(DATA_DIR, "dorm_data.json")
+# 전송 대기열/중복 확인 파일도 이 폴더에 (한 번 실행 봇과 따로)
+state_store.use_data_dir(DATA_DIR)
 
 TARGET_BOARDS = [
     {"id": "movein", "name": "입주/퇴거 공지", "url": "https://dorm.cnu.ac.kr/_prog/_board/?code=sub05_0501&site_dvs_cd=kr&menu_dvs_cd=030101"},
@@ -45,31 +50,30 @@ HEADERS = {
 # ==========================================
 
 def get_session():
-    """Network Level 재시도 세션"""
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(TARGET_BOARDS[0]["url"])
 
 def extract_id_from_link(link):
     match = re.search(r'no=(\d+)', link)
     if match: return int(match.group(1))
     return 0
 
-def send_discord_batch_alert(category_name, new_notices):
-    if not new_notices or not DISCORD_WEBHOOK_URL: return
-    count = len(new_notices)
-    message_content = f"### 🛌 [{category_name}] 새 글 {count}건\n\n"
-    for notice in new_notices:
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{notice['title']}](<{notice['link']}>)\n"
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content}, timeout=10)
-        print(f"✉ [전송 완료] {category_name} - {count}건")
-    except Exception as e:
-        print(f"⚠ [전송 실패] {e}")
+def parse_row(row):
+    a_tag = board_parser.find_link(row, cell="title")
+    if not a_tag: return None
+
+    title = a_tag['title'] or a_tag['text'].strip()
+    href = a_tag['href']
+
+    if href.startswith("?"): link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
+    elif href.startswith("/"): link = f"https://dorm.cnu.ac.kr{href}"
+    else: link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
+
+    article_id = extract_id_from_link(link)
+    if article_id == 0: return None
+
+    is_top = "공지" in row['cells'].get('num', "")
+    return {"id": article_id, "title": title, "link": link, "is_top": is_top}
 
 def send_simple_error_log(error_msg=None, is_fatal=False):
     """관리자 알림 함수 (치명적일 때만 강조)"""
@@ -81,8 +85,7 @@ def send_simple_error_log(error_msg=None, is_fatal=False):
     if error_msg: content += f"에러: ```{error_msg}```"
     if is_fatal: content += "\n📢 **모든 재시도 실패. 봇 점검이 필요합니다.**"
 
-    try: requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
-    except: pass
+    webhook_queue.send_now(MONITOR_WEBHOOK_URL, content)
 
 def check_board(session, board_info, saved_data):
     """
@@ -95,82 +98,51 @@ def check_board(session, board_info, saved_data):
 
     print(f"⌕ [{board_name}] 분석 중...")
 
-    # SSL 경고 무시 (이건 나중에 알아보기)
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    
     # 여기서 에러나면 상위 try-except로 넘어감
-    response = session.get(url, headers=HEADERS, verify=False, timeout=30)
+    response = session.get(url, headers=HEADERS, timeout=30)
+
+    # 목록(tbody) 해시가 지난번과 같으면 파싱 생략 (짧은 주기 폴링용)
+    hash_key = f"{board_id}_hash"
+    unchanged, body_hash = page_cache.same_body(saved_data, hash_key, response)
+    if unchanged:
+        print(f"☒ [{board_name}] 변경 없음 (해시)")
+        return False
+
     response.encoding = 'utf-8'
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    rows = soup.select('tbody > tr')
+    # 고정글은 전부, 일반글은 이미 본 글이 이어질 때까지만 읽음 (본 글 목록 없으면 최초 실행)
+    seen = seen_ids.load(saved_data.get(board_id))
+    rows = board_parser.iter_rows(response.content)
+    new_notices, row_count = board_parser.scan_new(rows, parse_row, seen)
     
     # HTML 구조 변경 감지
-    if not rows:
+    if not row_count:
         raise Exception(f"게시글(tr) 없음 - HTML 구조 변경 의심")
 
-    last_id = saved_data.get(board_id, 0)
-    new_notices = []
-    max_id = last_id
-
-    for row in rows:
-        title_td = row.select_one('td.title')
-        if not title_td: continue
-        a_tag = title_td.select_one('a')
-        if not a_tag: continue
+    saved_data[hash_key] = body_hash
 
-        title = a_tag.get('title') or a_tag.text.strip()
-        href = a_tag.get('href')
-
-        if href.startswith("?"): link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
-        elif href.startswith("/"): link = f"https://dorm.cnu.ac.kr{href}"
-        else: link = f"https://dorm.cnu.ac.kr/_prog/_board/{href}"
-
-        article_id = extract_id_from_link(link)
-        if article_id == 0: continue
-
-        is_top = "공지" in row.select_one('td.num').get_text() if row.select_one('td.num') else False
-
-        if article_id > last_id:
-            new_notices.append({
-                "id": article_id, "title": title, "link": link, "is_top": is_top
-            })
-            if article_id > max_id: max_id = article_id
-
-    # 최초 실행 처리
-    if last_id == 0 and max_id > 0:
-        print(f"☐ [{board_name}] 최초 실행 - 기준점 설정 (ID: {max_id})")
-        saved_data[board_id] = max_id
-        return True # 저장 필요 (꼭 필요 - 파일 생성 안될 때 있음)
-
-    if new_notices:
-        new_notices.sort(key=lambda x: x['id'])
-        send_discord_batch_alert(board_name, new_notices)
-        saved_data[board_id] = max_id
-        return True
-
-    return False
+    # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+    board_alerts.handle_page(saved_data, seen, new_notices, "dorm", board_id, board_id,
+                             board_name, f"### 🛌 [{board_name}] 새 글 {{count}}건\n\n", WEBHOOK_ENV)
+    return True
 
 def run_bot():
     print(f"🚀 기숙사 봇 시작 (주기: {CHECK_INTERVAL}초, 재시도: {MAX_RETRIES}회)")
 
+    # 데이터 파일은 시작할 때 한 번만 읽고 이후에는 메모리에서 갱신
+    saved_data = state_store.load(DATA_FILE)
+
     try:
         while True:
             print("\n" + "━" * 40)
             print(f"⏰ 검사 시작: {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-            saved_data = {}
-            if os.path.exists(DATA_FILE):
-                try:
-                    with open(DATA_FILE, "r", encoding="utf-8") as f: saved_data = json.load(f)
-                except: pass
-
             session = get_session()
             any_changes = False
             
             # 각 게시판 순회
             for board in TARGET_BOARDS:
-                time.sleep(random.uniform(1, 2)) # 게시판 사이 대기
+                rate_limiter.wait_for(board["url"]) # 게시판 사이 대기
                 
                 # [재시도 로직 적용]
                 board_success = False
@@ -189,13 +161,17 @@ def run_bot():
                 if not board_success:
                     send_simple_error_log(f"[{board['name']}] 3회 접속 실패", is_fatal=True)
 
+            # 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 주기에 재전송)
+            if board_alerts.apply_acked("dorm", saved_data, webhook_queue.flush(WEBHOOK_ENV)):
+                any_changes = True
+
             if any_changes:
-                with open(DATA_FILE, "w", encoding="utf-8") as f:
-                    json.dump(saved_data, f, ensure_ascii=False, indent=4)
+                state_store.save(DATA_FILE, saved_data)
                 print("☑ 데이터 저장 완료")
             else:
                 print("☒ 변동 사항 없음")
 
+            dedup.save()
             print(f"💤 {CHECK_INTERVAL}초 대기 중...")
             time.sleep(CHECK_INTERVAL)
 
@@ -204,6 +180,8 @@ def run_bot():
     except Exception as e:
         print(f"⚠ 치명적 오류: {e}")
         send_simple_error_log(f"메인 루프 종료됨\n{e}", is_fatal=True)
+    finally:
+        http_client.close_all()
 
 if __name__ == "__main__":
     run_bot()
\ No newline at end of file
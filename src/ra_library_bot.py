@@ -1,16 +1,20 @@
-import requests
-from bs4 import BeautifulSoup
 import os
 import time
-import json
 import re
-import urllib3
 import traceback
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from dotenv import load_dotenv
+import env_loader
 
-load_dotenv()
+import http_client
+import rate_limiter
+import page_cache
+import board_parser
+import seen_ids
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
+
+env_loader.load()
 
 # [설정 영역]
 # 30분 주기
@@ -20,7 +24,9 @@ CHECK_INTERVAL = 1800
 MAX_RETRIES = 3
 RETRY_DELAY = 60
 
-DISCORD_WEBHOOK_URL = os.environ.get("library_WEBHOOK_URL")
+WEBHOOK_ENV = "library_WEBHOOK_URL"
+# 본 글 목록 키("seen") -> 기록 DB/중복 확인에 쓰는 게시판 이름
+ARCHIVE_BOARDS = {"seen": "general"}
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 
 URL = "https://library.cnu.ac.kr/bbs/list/1"
@@ -30,6 +36,8 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 DATA_FILE = os.path.join(DATA_DIR, "library_data.json")
+# 전송 대기열/중복 확인 파일도 이 폴더에 (한 번 실행 봇과 따로)
+state_store.use_data_dir(DATA_DIR)
 
 HEADERS = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -40,13 +48,8 @@ HEADERS = {
 
 # ===[세션 생성기]===
 def get_session():
-    """Network Level 재시도 세션"""
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    adapter = HTTPAdapter(max_retries=retry)
-    session.mount('http://', adapter)
-    session.mount('https://', adapter)
-    return session
+    """호스트별 공용 세션 (연결/TLS 재사용, 백엔드/인증서 설정은 http_client)"""
+    return http_client.get_session(URL)
 
 # ===[ID 추출기]===
 def extract_id_from_link(link):
@@ -57,24 +60,22 @@ def extract_id_from_link(link):
     if match_slash: return int(match_slash.group(1))
     return 0
 
-# ===[디코 전송기]===
-def send_discord_message(new_notices):
-    if not new_notices or not DISCORD_WEBHOOK_URL: return
+# ===[행 파싱]===
+def parse_row(row):
+    a_tag = board_parser.find_link(row, cell="title") or board_parser.find_link(row, cell="subject") or board_parser.find_link(row)
+    if not a_tag: return None
 
-    count = len(new_notices)
-    message_content = f"### :books: [일반공지] 새 글 {count}건\n\n"
+    title = a_tag['title'] or a_tag['text'].strip()
+    title = title.replace("새글", "").strip()
 
-    for notice in new_notices:
-        title = notice['title']
-        link = notice['link']
-        icon = "▶" if notice['is_top'] else "▷"
-        message_content += f"{icon} [{title}](<{link}>)\n"
+    href = a_tag['href']
+    link = f"https://library.cnu.ac.kr{href}"
 
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": message_content}, timeout=10)
-        print(f"✉ [전송 완료] 도서관 공지 {count}건")
-    except Exception as e:
-        print(f"⚠ [전송 실패] {e}")
+    article_id = extract_id_from_link(link)
+    if article_id == 0: return None
+
+    is_top = 'always' in row['classes']
+    return {"id": article_id, "title": title, "link": link, "is_top": is_top}
 
 # ===[관리자 알림 함수]===
 def send_simple_error_log(error_msg=None, is_fatal=False):
@@ -90,8 +91,7 @@ def send_simple_error_log(error_msg=None, is_fatal=False):
     if error_msg: content += f"에러: ```{error_msg}```"
     if is_fatal: content += "\n> 📢 **모든 재시도 실패. 봇 점검이 필요합니다.**"
 
-    try: requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
-    except: pass
+    webhook_queue.send_now(MONITOR_WEBHOOK_URL, content)
 
 # ===[핵심 로직]===
 def check_library_notices(session, saved_data):
@@ -101,73 +101,49 @@ def check_library_notices(session, saved_data):
     """
     print(f"⌕ [도서관] 공지 확인 중...")
 
+    # 호스트별 토큰 버킷 (재시도 시에도 간격 유지)
+    rate_limiter.wait_for(URL)
+
     # 여기서 에러나면 상위 try-except로 넘어감
-    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-    response = session.get(URL, headers=HEADERS, verify=False, timeout=30)
+    response = session.get(URL, headers=HEADERS, timeout=30)
+
+    # 목록(tbody) 해시가 지난번과 같으면 파싱 생략 (짧은 주기 폴링용)
+    hash_key = "last_hash"
+    unchanged, body_hash = page_cache.same_body(saved_data, hash_key, response)
+    if unchanged:
+        print("☒ [도서관] 변경 없음 (해시)")
+        return False
+
     response.encoding = 'utf-8'
 
-    soup = BeautifulSoup(response.text, 'html.parser')
-    rows = soup.select('tbody > tr')
+    # 고정글은 전부, 일반글은 이미 본 글이 이어질 때까지만 읽음 (본 글 목록 없으면 최초 실행)
+    seen = seen_ids.load(saved_data.get("seen", saved_data.get("last_id")))
+    rows = board_parser.iter_rows(response.content)
+    new_notices, row_count = board_parser.scan_new(rows, parse_row, seen)
     
-    if not rows:
+    if not row_count:
         raise Exception("게시글(tr) 없음 - HTML 구조 변경 의심")
 
-    last_id = saved_data.get("last_id", 0)
-    new_notices = []
-    max_id_in_this_scan = last_id
-
-    for row in rows:
-        a_tag = row.select_one('td.title a') or row.select_one('td.subject a') or row.select_one('a')
-        if not a_tag: continue
-
-        title = a_tag.get('title') or a_tag.text.strip()
-        title = title.replace("새글", "").strip()
-
-        href = a_tag.get('href')
-        link = f"https://library.cnu.ac.kr{href}"
+    saved_data[hash_key] = body_hash
 
-        article_id = extract_id_from_link(link)
-        if article_id == 0: continue
-
-        is_top = 'always' in row.get('class', [])
-
-        if article_id > last_id:
-            new_notices.append({
-                "id": article_id, "title": title, "link": link, "is_top": is_top
-            })
-            if article_id > max_id_in_this_scan:
-                max_id_in_this_scan = article_id
-
-    # 최초 실행
-    if last_id == 0 and max_id_in_this_scan > 0:
-        print(f"☐ [도서관] 최초 실행 - 기준점(ID: {max_id_in_this_scan})만 설정")
-        saved_data["last_id"] = max_id_in_this_scan
-        return True
-
-    # 새 글 전송
-    if new_notices:
-        new_notices.sort(key=lambda x: x['id'])
-        send_discord_message(new_notices)
-        saved_data["last_id"] = max_id_in_this_scan
-        return True
-
-    return False
+    # 최초 실행 기준점 / 대기열·중복 제외 / 전송 대기 / 본 글 번호 갱신 (board_alerts)
+    board_alerts.handle_page(saved_data, seen, new_notices, "library", "general", "seen",
+                             "도서관", "### :books: [일반공지] 새 글 {count}건\n\n", WEBHOOK_ENV)
+    saved_data.pop("last_id", None)
+    return True
 
 # ===[MAIN]===
 def run_bot():
     print(f"🚀 도서관 봇 시작 (주기: {CHECK_INTERVAL}초, 재시도: {MAX_RETRIES}회)")
 
+    # 데이터 파일은 시작할 때 한 번만 읽고 이후에는 메모리에서 갱신
+    saved_data = state_store.load(DATA_FILE)
+
     try:
         while True:
             print("\n" + "━" * 40)
             print(f"⏰ 검사 시작: {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-            saved_data = {}
-            if os.path.exists(DATA_FILE):
-                try:
-                    with open(DATA_FILE, "r", encoding="utf-8") as f: saved_data = json.load(f)
-                except: pass
-
             session = get_session()
             any_changes = False
             success = False
@@ -184,17 +160,22 @@ def run_bot():
                     if attempt < MAX_RETRIES:
                         time.sleep(RETRY_DELAY)
             
+            # 대기열 전송 -> 전송 확인된 글만 본 글로 기록 (실패분은 다음 주기에 재전송)
+            if board_alerts.apply_acked("library", saved_data, webhook_queue.flush(WEBHOOK_ENV), ARCHIVE_BOARDS):
+                any_changes = True
+
             # 재시도 모두 실패 시
             if not success:
                 send_simple_error_log("3회 접속/파싱 실패", is_fatal=True)
-            elif any_changes:
-                # 성공했고 변경사항이 있을 때만 저장
-                with open(DATA_FILE, "w", encoding="utf-8") as f:
-                    json.dump(saved_data, f, indent=4)
+
+            # 변경사항이 있을 때만 저장
+            if any_changes:
+                state_store.save(DATA_FILE, saved_data)
                 print("☑ 데이터 저장 완료")
-            else:
+            elif success:
                 print("☒ 새 소식 없음")
 
+            dedup.save()
             print(f"💤 {CHECK_INTERVAL}초 대기 중...")
             time.sleep(CHECK_INTERVAL)
 
@@ -203,6 +184,8 @@ def run_bot():
     except Exception as e:
         print(f"⚠ 치명적 오류: {e}")
         send_simple_error_log(f"메인 루프 종료됨\n{e}", is_fatal=True)
+    finally:
+        http_client.close_all()
 
 if __name__ == "__main__":
     run_bot()
\ No newline at end of file
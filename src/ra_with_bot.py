@@ -1,24 +1,27 @@
 import os
 import time
-import json
-import requests
 import re
 import traceback
 from datetime import datetime
-from dotenv import load_dotenv
-import random
-import json as pyjson
+import env_loader
 
 # ===[셀레니움 관련 라이브러리]===
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-load_dotenv()
+import state_store
+import webhook_queue
+import message_packer
+import with_list
+import chrome_driver
+import with_session
+import http_client
+
+env_loader.load()
 
 # ===[설정 영역]==========================
 # 1시간 주기 (초)
@@ -30,27 +33,38 @@ RETRY_DELAY = 60
 
 USER_ID = os.environ.get("CNU_ID")
 USER_PW = os.environ.get("CNU_PW")
-DISCORD_WEBHOOK_URL = os.environ.get("with_WEBHOOK_URL")
+WEBHOOK_ENV = "with_WEBHOOK_URL"
+DISCORD_WEBHOOK_URL = os.environ.get(WEBHOOK_ENV)
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 
-LIST_URL = "https://with.cnu.ac.kr/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmList.do"
+LIST_URL = with_list.LIST_URL
+# 목록 읽는 방법 - http: 로그인만 브라우저로 하고 목록은 HTTP로 (실패하면 브라우저로)
+#                 selenium: 예전처럼 목록도 브라우저로 넘기며 읽기
+FETCH_MODE = os.environ.get("WITH_FETCH_MODE", "http")
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 DATA_FILE = os.path.join(DATA_DIR, "with_data.json")
+# 전송 대기열/중복 확인 파일도 이 폴더에 (한 번 실행 봇과 따로)
+state_store.use_data_dir(DATA_DIR)
+# 기준점: 최근 확인한 글 번호(encSddpbSeq) 이만큼 + 처음 본 시각
+# 목록을 위에서부터 읽다가 이 중 하나라도 만나면 멈춤 (글 하나가 지워져도 전체를 다시 읽지 않음)
+WATERMARK_SIZE = 100
+# 밀린 글이 많으면 이 페이지까지 읽음
+MAX_PAGES = 10
 
 PROFILE_DIR = os.path.join(BASE_DIR, "chrome_profile")
 if not os.path.exists(PROFILE_DIR):
     os.makedirs(PROFILE_DIR)
+
+# [브라우저 재사용] 이만큼 주기를 돌았거나 메모리가 넘으면 새로 띄움
+DRIVER_MAX_CYCLES = 24
+DRIVER_MAX_RSS_MB = 1500
 # ==========================================
 
 # === [함수] ===
-def clean_text(text):
-    if not text: return ""
-    return re.sub(r'\s+', ' ', text).strip()
-
 def parse_str_to_dt(date_str):
     if not date_str: return None
     try:
@@ -123,54 +137,62 @@ def calculate_multi_info(sub_items):
             
     return result
 
-# [new] 상세 정보 추출 - 인정시간 추가됨
-def extract_details(container):
+def extract_details(block):
+    """목록에서 읽은 글(dict, with_list 모양)에서 신청/운영/정원/인정시간 추출"""
     data = {"apply_raw": "", "oper_raw": "", "capacity": "", "time_raw": ""}
-    
-    # 1. 상단 정보 (.etc_info_txt) - 신청/운영 기간
-    try:
-        # .etc_info_txt 내부의 dl
-        for dl in container.find_elements(By.CSS_SELECTOR, ".etc_info_txt dl"):
-            dt = dl.find_element(By.TAG_NAME, "dt").get_attribute("textContent")
-            dd = dl.find_element(By.TAG_NAME, "dd").get_attribute("textContent")
-            
-            if "신청" in dt: 
-                data["apply_raw"] = clean_text(dd)
-            elif "운영" in dt or "교육기간" in dt: 
-                data["oper_raw"] = clean_text(dd)
-    except: pass
-
-    # 2. 하단 정보 ().rq_desc) - 정원 및 인정시간
-    try:
-        #.rq_desc 내부의 dl
-        rq_desc = container.find_element(By.CSS_SELECTOR, ".rq_desc")
-        
-        # (1) 정원 찾기
-        for dl in rq_desc.find_elements(By.TAG_NAME, "dl"):
-            dt_text = dl.find_element(By.TAG_NAME, "dt").get_attribute("textContent")
-            if "모집" in dt_text or "정원" in dt_text:
-                data["capacity"] = clean_text(dl.find_element(By.TAG_NAME, "dd").get_attribute("textContent"))
-
-        # (2) [NEW] 인정시간 찾기 (dl class="mileage") 이렇게 생김!
-        try:
-            mileage_dl = rq_desc.find_element(By.CLASS_NAME, "mileage")
-            # 텍스트 추출 (예: "3.0 시간")
-            data["time_raw"] = clean_text(mileage_dl.find_element(By.TAG_NAME, "dd").get_attribute("textContent"))
-        except: 
-            pass # mileage 클래스가 없을 경우 패스 (오류 방지!)
-
-    except: pass
-    
+    for dt, dd in block["etc"]:
+        if "신청" in dt: data["apply_raw"] = dd
+        elif "운영" in dt or "교육기간" in dt: data["oper_raw"] = dd
+    for dt, dd, classes in block["rq"]:
+        if "모집" in dt or "정원" in dt: data["capacity"] = dd
+        if "mileage" in classes: data["time_raw"] = dd
     return data
 
+def new_item(pid, title, d_day, is_multi):
+    return {
+        "id": pid, "title": title, "d_day": d_day, "link": with_list.DETAIL_URL.format(pid),
+        "is_multi": is_multi, "sub_items": [], "multi_calc": {},
+        "apply_raw": "", "oper_raw": "", "capacity": "", "time_raw": ""
+    }
+
+def build_item(raw):
+    """목록에서 읽은 글(dict) -> 전송용 정보"""
+    p_data = new_item(raw["pid"], raw["title"], raw["d_day"], "multi_class" in raw["classes"])
+    if p_data["is_multi"]:
+        p_data['sub_items'] = [{"title": sub["title"], **extract_details(sub)} for sub in raw["subs"]]
+        # 세부 반이 안 보이면 글 자체 정보로 계산
+        p_data['multi_calc'] = calculate_multi_info(p_data['sub_items'] or [extract_details(raw)])
+    else:
+        p_data.update(extract_details(raw))
+    return p_data
+
 # === [디스코드 알림 함수] ===
-def post_to_discord_safe(content):
+def post_to_discord_safe(payload, refs=None):
     if not DISCORD_WEBHOOK_URL: return
-    try:
-        requests.post(DISCORD_WEBHOOK_URL, json={"content": content}, timeout=10)
-        print("✉ [알림 전송 성공]")
-    except Exception as e:
-        print(f"⚠ [알림 전송 실패] {e}")
+    webhook_queue.enqueue(WEBHOOK_ENV, payload, refs)
+
+def flush_outbox(saved_data):
+    """대기열 전송 후 전송 확인된 글 번호만 기준점에 추가 (실패분은 다음 실행 때 재전송)"""
+    acked = webhook_queue.flush(WEBHOOK_ENV)
+    if acked:
+        mark_seen(saved_data, acked)
+        state_store.save(DATA_FILE, saved_data)
+
+# ===[기준점]===
+def load_watermark(saved_data):
+    """기준점 목록 {글 번호: 처음 본 시각} (예전 last_read_id/sent_ids는 옮겨 담음)"""
+    legacy = [saved_data.pop("last_read_id", None)] + saved_data.pop("sent_ids", [])
+    mark_seen(saved_data, [pid for pid in legacy if pid])
+    return saved_data["watermark"]
+
+def mark_seen(saved_data, pids, now=None):
+    """기준점에 추가 (이미 있으면 처음 본 시각 유지, 최근 WATERMARK_SIZE개만 남김)"""
+    watermark = saved_data.setdefault("watermark", {})
+    now = int(now or time.time())
+    for pid in pids:
+        watermark.setdefault(pid, now)
+    if len(watermark) > WATERMARK_SIZE:
+        saved_data["watermark"] = dict(sorted(watermark.items(), key=lambda kv: kv[1])[-WATERMARK_SIZE:])
 
 def send_simple_error_log(error_msg=None, is_fatal=False):
     if not MONITOR_WEBHOOK_URL: return
@@ -179,8 +201,7 @@ def send_simple_error_log(error_msg=None, is_fatal=False):
     content = f"{title}\n시간: {now}\n"
     if error_msg: content += f"내용: ```{error_msg}```"
     if is_fatal: content += "\n> 📢 **모든 재시도 실패. 봇 점검이 필요합니다.**"
-    try: requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
-    except: pass
+    webhook_queue.send_now(MONITOR_WEBHOOK_URL, content)
 
 # [핵심] 메시지 생성 함수 (인정시간 표시 추가)
 def create_message_content(info):
@@ -236,14 +257,12 @@ def create_message_content(info):
 def send_batch_messages(new_items):
     if not new_items: return
     count = len(new_items)
-    full_message = f"### :compass: [CNU With+] 새로운 비교과 {count}건\n\n"
-    for item in reversed(new_items):
-        content_chunk = create_message_content(item)
-        if len(full_message) + len(content_chunk) > 1900:
-            post_to_discord_safe(full_message)
-            full_message = ""
-        full_message += content_chunk
-    if full_message: post_to_discord_safe(full_message)
+    header = f"### :compass: [CNU With+] 새로운 비교과 {count}건\n\n"
+    items = list(reversed(new_items))
+    blocks = [create_message_content(item) for item in items]
+    # 디스코드 제한에 맞춰 최소 개수의 메시지로 나눔
+    for payload, refs in message_packer.build(header, blocks, [item['id'] for item in items]):
+        post_to_discord_safe(payload, refs)
 
 # === [브라우저 생성 함수] ===
 def create_driver():
@@ -252,26 +271,95 @@ def create_driver():
     # chrome_options.add_argument("--headless") 
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
     chrome_options.add_argument("--window-size=1920,1080")
+    # 이미지/폰트 차단, 백그라운드 기능/캐시 끄기
+    chrome_driver.apply_scrape_profile(chrome_options)
     
-    # [핵심] 프로필 유지
+    # [핵심] 프로필 유지 (로그인 쿠키만 남기고 캐시는 띄우기 전에 정리)
+    chrome_driver.prune_profile(PROFILE_DIR)
     chrome_options.add_argument(f"user-data-dir={PROFILE_DIR}")
 
-    # === [수정된 부분: 드라이버 경로 자동 선택] ===
-    server_driver_path = "/usr/bin/chromedriver"
-    
-    if os.path.exists(server_driver_path):
-        # 1. 서버 환경 (파일이 존재함)
-        print(f"💻 서버 환경 감지: {server_driver_path} 사용")
-        service = Service(server_driver_path)
-    else:
-        # 2. 로컬 환경 (파일이 없음 -> 자동 관리)
-        # Selenium 4.6+ 버전부터는 드라이버를 지정하지 않으면 알아서 설치/실행합니다.
-        print("💻 로컬 환경 감지: 드라이버 자동 관리 모드 사용")
-        service = Service() 
+    # 드라이버 경로: 크롬 버전별 캐시 -> 서버 드라이버 -> 다운로드 (chrome_driver.py)
+    service = chrome_driver.service()
+
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    chrome_driver.block_resources(driver)
+    return driver
+
+# === [드라이버 풀] ===
+# 크롬을 주기마다 새로 띄우지 않고 하나를 계속 살려서 재사용
+# (FETCH_MODE=http면 로그인할 때만 띄우고 주기 끝에 닫음)
+# 응답이 없거나, DRIVER_MAX_CYCLES번 썼거나, 메모리가 DRIVER_MAX_RSS_MB를 넘으면 재시작
+_driver = None
+_driver_cycles = 0
+
+def _process_tree_rss_mb(root_pid):
+    """크롬드라이버 + 자식 프로세스(크롬, 렌더러) 메모리 합계 (리눅스 /proc 기준, 없으면 0)"""
+    if not os.path.isdir("/proc"): return 0
+    children = {}
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit(): continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            children.setdefault(ppid, []).append(int(pid))
+        except: continue
+
+    total_kb, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+        except: pass
+        stack.extend(children.get(pid, []))
+    return total_kb / 1024
+
+def _driver_rss_mb(driver):
+    try: return _process_tree_rss_mb(driver.service.process.pid)
+    except: return 0
+
+def is_driver_healthy(driver):
+    """창이 살아 있고 세션이 응답하는지"""
+    try:
+        if not driver.window_handles: return False
+        return driver.execute_script("return 1") == 1
+    except:
+        return False
+
+def get_driver():
+    """살아 있는 브라우저 반환 (필요하면 재시작)"""
+    global _driver, _driver_cycles
+    if _driver is not None:
+        reason = None
+        if not is_driver_healthy(_driver):
+            reason = "응답 없음"
+        elif _driver_cycles >= DRIVER_MAX_CYCLES:
+            reason = f"{_driver_cycles}회 사용"
+        else:
+            rss = _driver_rss_mb(_driver)
+            if rss > DRIVER_MAX_RSS_MB:
+                reason = f"메모리 {rss:.0f}MB"
+        if reason:
+            print(f"♻ 브라우저 재시작 ({reason})")
+            quit_driver()
+
+    if _driver is None:
+        _driver = create_driver()
+        _driver_cycles = 0
+    _driver_cycles += 1
+    return _driver
+
+def quit_driver():
+    global _driver
+    if _driver is not None:
+        try: _driver.quit()
+        except: pass
+    _driver = None
 
-    return webdriver.Chrome(service=service, options=chrome_options)
 def login_process(driver, wait):
     driver.get("https://with.cnu.ac.kr/index.do")
     try:
@@ -309,110 +397,109 @@ def login_process(driver, wait):
     except Exception as e:
         raise e
 
+# === [목록 읽기] ===
+# HTTP/브라우저 모두 페이지마다 (페이지 번호, 글 목록(dict)) 을 내보냄
+def selenium_pages(driver):
+    try: with_list.open_list(driver)
+    except: return
+
+    for page in range(1, MAX_PAGES + 1):
+        if page > 1:
+            try: with_list.go_to_page(driver, page)
+            except: return
+
+        # 글 목록 전체를 스크립트 한 번으로 읽음
+        items = with_list.read_driver_page(driver)
+        yield page, items
+
+def scan_pages(pages, saved_data, pending):
+    """
+    위에서부터 읽다가 기준점(최근 확인한 글) 중 하나라도 만나면 멈춤 -> 읽는 페이지 수 = 새 글 양
+    최초 실행(기준점 없음)은 첫 페이지만 읽어서 기준점으로 씀
+    반환: (새 글 목록, 새 글은 아니지만 기준점에 넣을 글 번호)
+    """
+    watermark = saved_data.get("watermark", {})
+    is_first = not watermark
+    new_items, known, scanned = [], [], set()
+    for page, raws in pages:
+        pids = [raw["pid"] for raw in raws if raw["pid"]]
+        # 빈 페이지 / 같은 페이지 반복 = 마지막 페이지를 넘어감
+        if not pids or scanned.issuperset(pids): break
+        for raw in raws:
+            pid = raw["pid"]
+            if not pid or pid in scanned: continue
+            scanned.add(pid)
+            if pid in watermark: return new_items, known
+            if is_first:
+                known.append(pid)
+                continue
+            # 대기열에 있는 글 (전송 전)
+            if pid in pending: continue
+            try: new_items.append(build_item(raw))
+            except: known.append(pid)
+        if is_first: break
+    return new_items, known
+
+def open_logged_in_driver():
+    """재사용 중인 브라우저로 로그인 확인 (필요하면 로그인)"""
+    driver = get_driver()
+    login_process(driver, WebDriverWait(driver, 20))
+    chrome_driver.keep_login_cookies(driver)
+    return driver
+
+def collect_items(saved_data, pending):
+    """
+    FETCH_MODE가 http면 목록을 HTTP로 읽음 (저장된 로그인 쿠키가 유효하면 브라우저를 띄우지 않음)
+    HTTP로 못 읽으면 브라우저로 다시 읽음
+    """
+    driver = None
+    if FETCH_MODE == "http":
+        session = with_session.load()
+        if session is None:
+            driver = open_logged_in_driver()
+            session = with_session.save_from_driver(driver)
+        try:
+            return scan_pages(with_list.iter_pages(session, MAX_PAGES), saved_data, pending)
+        except Exception as e:
+            print(f"⚠ HTTP 목록 읽기 실패 -> 브라우저로 재시도: {e}")
+            with_session.clear()
+    return scan_pages(selenium_pages(driver or open_logged_in_driver()), saved_data, pending)
+
 # === [메인 로직] ===
 def perform_scraping_cycle():
-    driver = None
     try:
-        driver = create_driver()
-        wait = WebDriverWait(driver, 20)
-        login_process(driver, wait)
-
-        last_read_id = None
-        is_first = False
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, "r", encoding="utf-8") as f:
-                    last_read_id = json.load(f).get("last_read_id")
-            except: pass
-        if not last_read_id: is_first = True
-
-        driver.get(LIST_URL)
-        time.sleep(random.uniform(2, 4))
-
-        new_items = []
-        stop = False
-        top_id = None
-
-        for page in range(1, 4):
-            if stop: break
-            if page > 1:
-                try:
-                    driver.execute_script(f"global.page({page});")
-                    time.sleep(random.uniform(2, 4))
-                except: break
-
-            items = driver.find_elements(By.CSS_SELECTOR, "li:has(div.cont_box)")
-            if not items:
-                items = [li for li in driver.find_elements(By.CSS_SELECTOR, "li") if li.find_elements(By.CLASS_NAME, "cont_box")]
-            if not items: continue
-
-            for item in items:
-                try:
-                    a_tag = item.find_element(By.CSS_SELECTOR, "a.tit")
-                    pid = ""
-                    try: pid = pyjson.loads(a_tag.get_attribute("data-params")).get("encSddpbSeq")
-                    except: pass
-                    if not pid: continue
-                    if top_id is None: top_id = pid
-                    if pid == last_read_id:
-                        stop = True
-                        break
-                    if is_first: continue
-
-                    link = f"https://with.cnu.ac.kr/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmInfo.do?encSddpbSeq={pid}&paginationInfo.currentPageNo=1"
-                    full_title = a_tag.get_attribute("textContent")
-                    try: title = clean_text(full_title.replace(a_tag.find_element(By.CLASS_NAME, "label").get_attribute("textContent"), ""))
-                    except: title = clean_text(full_title)
-                    try: d_day = clean_text(item.find_element(By.CSS_SELECTOR, "span.day").get_attribute("textContent"))
-                    except: d_day = ""
-
-                    is_multi = "multi_class" in item.get_attribute("class")
-                    p_data = {
-                        "id": pid, "title": title, "d_day": d_day, "link": link,
-                        "is_multi": is_multi, "sub_items": [], "multi_calc": {},
-                        "apply_raw": "", "oper_raw": "", "capacity": "", "time_raw": ""
-                    }
-
-                    try:
-                        more = item.find_elements(By.CLASS_NAME, "class_more_open")
-                        if more and more[0].is_displayed():
-                            driver.execute_script("arguments[0].click();", more[0])
-                            time.sleep(0.5)
-                    except: pass
-
-                    if is_multi:
-                        for sub in item.find_elements(By.CLASS_NAME, "class_cont"):
-                            if not sub.get_attribute("textContent").strip(): continue
-                            try:
-                                s_title = sub.find_element(By.CSS_SELECTOR, "a.tit").get_attribute("textContent")
-                                try: s_title = s_title.replace(sub.find_element(By.CLASS_NAME, "label").get_attribute("textContent"), "")
-                                except: pass
-                                p_data['sub_items'].append({"title": clean_text(s_title), **extract_details(sub)})
-                            except: continue
-                        p_data['multi_calc'] = calculate_multi_info(p_data['sub_items'])
-                    else:
-                        p_data.update(extract_details(item))
-
-                    new_items.append(p_data)
-                except: continue
+        saved_data = state_store.load(DATA_FILE)
+        is_first = not load_watermark(saved_data)
+        pending = webhook_queue.pending_refs(WEBHOOK_ENV)
+        new_items, known = collect_items(saved_data, pending)
+        mark_seen(saved_data, known)
 
         if is_first:
-            if top_id:
-                with open(DATA_FILE, "w", encoding="utf-8") as f: json.dump({"last_read_id": top_id}, f)
+            state_store.save(DATA_FILE, saved_data)
             print("☐ 최초 실행 - 기준점 설정 완료")
-        elif new_items:
-            print(f"● {len(new_items)}개 새 글 발견")
-            send_batch_messages(new_items)
-            if top_id:
-                with open(DATA_FILE, "w", encoding="utf-8") as f: json.dump({"last_read_id": top_id}, f)
         else:
-            print("☒ 새 글 없음")
+            if new_items:
+                print(f"● {len(new_items)}개 새 글 발견")
+                send_batch_messages(new_items)
+            else:
+                print("☒ 새 글 없음")
+            # 대기열에 못 넣은 글(웹후크 없음)은 바로 기준점에, 나머지는 전송 확인 후 추가
+            queued = webhook_queue.pending_refs(WEBHOOK_ENV)
+            mark_seen(saved_data, [item['id'] for item in new_items if item['id'] not in queued])
+            state_store.save(DATA_FILE, saved_data)
+            flush_outbox(saved_data)
 
     except Exception as e:
+        # 실패한 브라우저는 버리고 재시도 때 새로 띄움
+        quit_driver()
         raise e
     finally:
-        if driver:
-            try: driver.quit()
+        if FETCH_MODE == "http":
+            # 다음 주기는 저장된 쿠키로 읽으므로 브라우저는 닫음 (세션이 풀리면 그때 다시 띄움)
+            quit_driver()
+        elif _driver is not None:
+            # 대기하는 동안 페이지 메모리 비우기 (브라우저는 유지)
+            try: _driver.get("about:blank")
             except: pass
 
 def run_selenium_scraper():
@@ -438,10 +525,15 @@ def run_selenium_scraper():
                 error_msg = f"{MAX_RETRIES}회 재시도 실패.\n마지막 에러: {last_error}\n{traceback.format_exc()}"
                 print("❌ 모든 재시도 실패. 관리자 알림 전송.")
                 send_simple_error_log(error_msg, is_fatal=True)
+            # 실패한 주기에 쌓인 것 + 지난번에 못 보낸 것 전송
+            flush_outbox(state_store.load(DATA_FILE))
             print(f"💤 {CHECK_INTERVAL}초 대기 중...")
             time.sleep(CHECK_INTERVAL)
     except KeyboardInterrupt:
         print("\n👋 봇을 종료합니다.")
+    finally:
+        quit_driver()
+        http_client.close_all()
 
 if __name__ == "__main__":
     run_selenium_scraper()
\ No newline at end of file
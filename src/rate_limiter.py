@@ -0,0 +1,67 @@
+import time
+import random
+import threading
+from urllib.parse import urlparse
+
+# ===[설정 영역]==========================
+# 호스트별 요청 예산 (토큰 버킷)
+# interval: 토큰 1개가 다시 차는 시간(초) / burst: 최대 토큰 수 / jitter: 기다려야 할 때 추가로 더하는 랜덤 시간
+HOST_LIMITS = {
+    "computer.cnu.ac.kr": {"interval": 4.0, "burst": 1, "jitter": (0, 2)},
+    "dorm.cnu.ac.kr": {"interval": 3.0, "burst": 1, "jitter": (0, 1)},
+    "library.cnu.ac.kr": {"interval": 3.0, "burst": 1, "jitter": (0, 2)},
+    # with+는 목록 2~3페이지를 동시에 요청하므로 3개까지 한 번에 허용
+    "with.cnu.ac.kr": {"interval": 3.0, "burst": 3, "jitter": (0, 1)},
+}
+DEFAULT_LIMIT = {"interval": 3.0, "burst": 1, "jitter": (0, 1)}
+# ==========================================
+
+# 호스트 -> {"tokens": 남은 토큰, "updated": 마지막 갱신 시각}
+_buckets = {}
+_lock = threading.Lock()
+
+
+def get_host(url):
+    """URL이면 호스트만, 이미 호스트면 그대로"""
+    return urlparse(url).netloc or url
+
+
+def reserve(url):
+    """
+    토큰 1개 예약 후 기다려야 할 시간(초) 반환
+    토큰이 남아 있으면 0 (바로 요청), 모자라면 차는 데 걸리는 시간 + 지터
+    """
+    host = get_host(url)
+    limit = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+
+    with _lock:
+        now = time.monotonic()
+        bucket = _buckets.setdefault(host, {"tokens": limit["burst"], "updated": now})
+
+        # 지난 시간만큼 토큰 채우기 (최대 burst)
+        elapsed = now - bucket["updated"]
+        bucket["tokens"] = min(limit["burst"], bucket["tokens"] + elapsed / limit["interval"])
+        bucket["updated"] = now
+
+        # 음수가 되면 그만큼 빚진 상태 -> 다음 요청은 더 기다림
+        bucket["tokens"] -= 1
+        if bucket["tokens"] >= 0:
+            return 0.0
+        return -bucket["tokens"] * limit["interval"] + random.uniform(*limit["jitter"])
+
+
+def wait_for(url):
+    """동기 버전 (각 봇 파일용)"""
+    delay = reserve(url)
+    if delay > 0:
+        print(f"⏳ [{get_host(url)}] {delay:.1f}초 대기...")
+        time.sleep(delay)
+
+
+async def async_wait_for(url):
+    """비동기 버전 (스케줄러용, asyncio는 스케줄러가 이미 불러온 상태)"""
+    import asyncio
+    delay = reserve(url)
+    if delay > 0:
+        print(f"⏳ [{get_host(url)}] {delay:.1f}초 대기...")
+        await asyncio.sleep(delay)
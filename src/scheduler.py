@@ -0,0 +1,195 @@
+import asyncio
+import argparse
+import importlib
+import time
+import traceback
+
+import rate_limiter
+import page_cache
+import state_store
+import dedup
+import webhook_queue
+import board_alerts
+import http_client
+
+# ===[설정 영역]==========================
+# 여러 봇을 프로세스 하나에서 실행 (.env/import/HTTP 연결/대기열을 봇끼리 공유)
+#   python src --bots cse,dorm,library          (한 번 실행, 기본 / python src/scheduler.py 도 같음)
+#   python src --bots cse,dorm,library,with --daemon --interval 600
+# 봇별 게시판 정의는 각 봇 파일(TARGET_BOARDS / URL)에서 그대로 가져옴
+# 봇 모듈은 고른 것만 import (with를 안 고르면 셀레니움 쪽은 안 불러옴)
+BOT_MODULES = {
+    "cse": "cse_bot",
+    "dorm": "dorm_bot",
+    "library": "library_bot",
+    "with": "with_bot",
+}
+DEFAULT_BOTS = ["cse", "dorm", "library"]
+# --daemon 일 때 검사 간격(초)
+DAEMON_INTERVAL = 600
+# ==========================================
+
+
+# ===[작업 목록 생성]===
+def load_jobs(bot_name):
+    """
+    봇 하나를 (호스트, 게시판 이름, 검사 함수) 목록으로 변환
+    검사 함수는 check(session, saved_data) -> 변경 여부
+    """
+    if bot_name not in BOT_MODULES:
+        raise ValueError(f"알 수 없는 봇: {bot_name}")
+    module = importlib.import_module(BOT_MODULES[bot_name])
+    if bot_name == "with":
+        # with+는 로그인/목록 읽기/전송/저장을 봇이 한 번에 처리 -> 작업 하나로 실행
+        return module, [{
+            "host": rate_limiter.get_host(module.LIST_URL),
+            "name": "WITH 비교과",
+            "run": module.run_selenium_scraper,
+        }]
+    if bot_name == "library":
+        boards = [{"id": "seen", "name": "도서관 일반공지", "url": module.URL}]
+    else:
+        boards = module.TARGET_BOARDS
+
+    jobs = []
+    for board in boards:
+        if bot_name == "library":
+            check = module.check_library_notices
+        else:
+            # board를 기본 인자로 묶어둠 (반복문 변수 캡처 방지)
+            check = lambda session, saved_data, board=board: module.check_board(session, board, saved_data)
+        jobs.append({
+            "host": rate_limiter.get_host(board["url"]),
+            "url": board["url"],
+            "name": board["name"],
+            "check": check,
+        })
+    return module, jobs
+
+
+# ===[호스트 단위 실행]===
+async def run_host(host, entries, limit=None):
+    """
+    같은 호스트의 게시판은 순서대로 (요청 간격은 rate_limiter가 관리)
+    다른 호스트끼리는 이 코루틴이 동시에 돌아감 (limit: 동시에 도는 호스트 수 제한)
+    """
+    if limit is not None:
+        async with limit:
+            return await run_host(host, entries)
+
+    for entry in entries:
+        if "run" in entry:
+            # 봇이 알아서 끝까지 처리 (에러 알림/저장 포함)
+            await asyncio.to_thread(entry["run"])
+            continue
+        module, job, session, saved_data, changed = entry
+        # 호스트별 토큰 버킷이 필요한 만큼만 대기
+        await rate_limiter.async_wait_for(job["url"])
+
+        try:
+            # 블로킹 HTTP 요청/파싱은 스레드에서 실행
+            if await asyncio.to_thread(job["check"], session, saved_data):
+                changed[0] = True
+        except Exception as e:
+            print(f"⚠ [{job['name']}] 에러: {e}")
+            module.send_simple_error_log(f"[{job['name']}] 접속 실패\n{str(e)}")
+
+
+# ===[MAIN]===
+async def run_all(bot_names=None, concurrency=0):
+    """고른 봇의 게시판을 호스트별로 병렬 검사 (concurrency: 동시에 검사할 호스트 수, 0이면 제한 없음)"""
+    bot_names = bot_names or DEFAULT_BOTS
+    print("\n" + "━" * 40)
+    print(f"🤖 통합 스케줄러 실행: {time.strftime('%Y-%m-%d %H:%M:%S')} ({', '.join(bot_names)})")
+    started = time.time()
+
+    bots = []
+    by_host = {}
+    for bot_name in bot_names:
+        module, jobs = load_jobs(bot_name)
+        if bot_name == "with":
+            for job in jobs:
+                by_host.setdefault(job["host"], []).append(job)
+            continue
+        # 봇마다 세션/데이터 하나 (같은 봇 게시판끼리 공유)
+        session = module.get_session()
+        saved_data = state_store.load(module.DATA_FILE)
+        changed = [False]
+        bots.append((bot_name, module, saved_data, changed))
+        for job in jobs:
+            by_host.setdefault(job["host"], []).append((module, job, session, saved_data, changed))
+
+    limit = asyncio.Semaphore(concurrency) if concurrency > 0 else None
+    await asyncio.gather(*(run_host(host, entries, limit) for host, entries in by_host.items()))
+
+    for bot_name, module, saved_data, changed in bots:
+        # 봇마다 이번 실행에 쌓인 메시지를 게시판 구분 없이 합쳐서 전송
+        # 전송 확인된 글만 본 글로 기록 (실패분은 다음 실행 때 재전송)
+        acked = webhook_queue.flush(module.WEBHOOK_ENV)
+        if board_alerts.apply_acked(bot_name, saved_data, acked, getattr(module, "ARCHIVE_BOARDS", None)):
+            changed[0] = True
+        if changed[0]:
+            state_store.save(module.DATA_FILE, saved_data)
+            print(f"☑ [{bot_name}] 데이터 저장 완료")
+        else:
+            print(f"☒ [{bot_name}] 변동 사항 없음")
+    page_cache.save()
+    dedup.save()
+
+    print(f"⏱ 전체 검사 {time.time() - started:.1f}초")
+
+
+async def run_daemon(bot_names=None, concurrency=0, interval=DAEMON_INTERVAL):
+    """interval초마다 run_all 반복 (세션/연결은 계속 재사용)"""
+    while True:
+        try:
+            await run_all(bot_names, concurrency)
+        except Exception as e:
+            print(f"⚠ 검사 중 오류: {e}")
+            traceback.print_exc()
+        print(f"💤 {interval}초 대기 중...")
+        await asyncio.sleep(interval)
+
+
+def parse_bots(value):
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BOT_MODULES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"알 수 없는 봇: {', '.join(unknown)} (가능: {', '.join(BOT_MODULES)})")
+    return names
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CNU 공지봇 통합 실행")
+    parser.add_argument("names", nargs="*", help="예전 방식 봇 이름 (--bots와 같음)")
+    parser.add_argument("--bots", type=parse_bots, help=f"실행할 봇 (쉼표 구분, 기본: {','.join(DEFAULT_BOTS)})")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="한 번 검사하고 종료 (기본)")
+    mode.add_argument("--daemon", action="store_true", help="--interval초마다 계속 검사")
+    parser.add_argument("--interval", type=int, default=DAEMON_INTERVAL, help="--daemon 검사 간격(초)")
+    parser.add_argument("--concurrency", type=int, default=0, help="동시에 검사할 호스트 수 (0: 제한 없음)")
+    args = parser.parse_args(argv)
+    if args.names:
+        try: args.bots = (args.bots or []) + parse_bots(",".join(args.names))
+        except argparse.ArgumentTypeError as e: parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    try:
+        if args.daemon:
+            asyncio.run(run_daemon(args.bots, args.concurrency, args.interval))
+        else:
+            asyncio.run(run_all(args.bots, args.concurrency))
+    except KeyboardInterrupt:
+        print("\n👋 봇을 종료합니다.")
+    except Exception as e:
+        print(f"⚠ 치명적인 오류 발생: {e}")
+        traceback.print_exc()
+    finally:
+        http_client.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import time
+import bisect
+from array import array
+
+# ===[설정 영역]==========================
+# 본 글 번호를 게시판마다 최근 것만 기억 (last_id 하나로는 늦게 올라온 옛 번호 글을 놓침)
+MAX_AGE = 60 * 24 * 3600   # 처음 본 지 60일 지난 번호는 삭제
+MAX_SIZE = 500             # 게시판당 최대 개수
+# 이미 본 일반글이 연속 이만큼 나오면 그 아래는 읽지 않음
+STOP_AFTER_SEEN = 5
+# ==========================================
+
+# 데이터 파일 저장 모양 (게시판 하나)
+# {
+#     "floor": 574001,           # 이 번호 미만은 전부 본 것으로 취급
+#     "ids": [574626, ...],      # floor 이상에서 본 번호 (오름차순)
+#     "seen": [1735000000, ...]  # ids와 같은 순서, 처음 본 시각
+# }
+# 예전 형식(정수 last_id)은 floor = last_id + 1 로 변환
+
+
+def load(entry):
+    """데이터 파일 값 -> 상태 dict (없으면 None = 최초 실행)"""
+    if entry is None:
+        return None
+    if isinstance(entry, int):
+        return {"floor": entry + 1, "ids": array("q"), "seen": array("q")}
+    return {
+        "floor": entry.get("floor", 0),
+        "ids": array("q", entry.get("ids", [])),
+        "seen": array("q", entry.get("seen", [])),
+    }
+
+
+def dump(state):
+    """상태 dict -> 데이터 파일 값"""
+    return {"floor": state["floor"], "ids": state["ids"].tolist(), "seen": state["seen"].tolist()}
+
+
+def empty():
+    return {"floor": 0, "ids": array("q"), "seen": array("q")}
+
+
+# ===[조회/추가]===
+def contains(state, article_id):
+    """floor 미만이거나 목록에 있으면 본 글 (이진 탐색)"""
+    if article_id < state["floor"]:
+        return True
+    ids = state["ids"]
+    i = bisect.bisect_left(ids, article_id)
+    return i < len(ids) and ids[i] == article_id
+
+
+def add(state, article_id, now=None):
+    if contains(state, article_id): return
+    ids = state["ids"]
+    i = bisect.bisect_left(ids, article_id)
+    ids.insert(i, article_id)
+    state["seen"].insert(i, int(now or time.time()))
+
+
+def newest(state):
+    """본 글 중 가장 큰 번호 (로그용)"""
+    if state["ids"]:
+        return state["ids"][-1]
+    return state["floor"] - 1 if state["floor"] else 0
+
+
+def record(state, notices, now=None):
+    """이번에 찾은 글 번호 추가 후 오래된 번호 정리"""
+    for notice in notices:
+        add(state, notice["id"], now)
+    evict(state, now)
+
+
+# ===[정리]===
+def evict(state, now=None):
+    """
+    오래된 번호 삭제 (MAX_AGE / MAX_SIZE)
+    지운 번호 이하는 floor로 올려서 다시 새 글로 잡히지 않게 함
+    """
+    now = int(now or time.time())
+    ids, seen = state["ids"], state["seen"]
+
+    expired = {i for i in range(len(ids)) if now - seen[i] > MAX_AGE}
+    overflow = len(ids) - len(expired) - MAX_SIZE
+    if overflow > 0:
+        # 개수 초과분은 처음 본 시각이 오래된 순서로 추가 삭제
+        remaining = sorted((i for i in range(len(ids)) if i not in expired), key=lambda i: seen[i])
+        expired.update(remaining[:overflow])
+    if not expired: return
+
+    state["floor"] = max(state["floor"], max(ids[i] for i in expired) + 1)
+    keep = [i for i in range(len(ids)) if i not in expired and ids[i] >= state["floor"]]
+    state["ids"] = array("q", (ids[i] for i in keep))
+    state["seen"] = array("q", (seen[i] for i in keep))
+
+
+# ===[전송 확인 후 기록]===
+def ref(board_key, article_id):
+    """전송 대기열(webhook_queue)에 같이 넣는 글 표시 ("<데이터 파일 키>:<번호>")"""
+    return f"{board_key}:{article_id}"
+
+
+def apply_refs(saved_data, refs, now=None):
+    """전송 확인된 글을 게시판별 본 글 목록에 추가 (바뀐 게 있으면 True)"""
+    by_board = {}
+    for r in refs:
+        board_key, _, article_id = str(r).rpartition(":")
+        if not board_key or not article_id.isdigit(): continue
+        by_board.setdefault(board_key, []).append({"id": int(article_id)})
+
+    for board_key, notices in by_board.items():
+        state = load(saved_data.get(board_key)) or empty()
+        record(state, notices, now)
+        saved_data[board_key] = dump(state)
+    return bool(by_board)
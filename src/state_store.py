@@ -0,0 +1,129 @@
+import os
+import json
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl  # 리눅스/맥 (GitHub Actions, 서버)
+except ImportError:
+    fcntl = None  # 윈도우 로컬 실행 시에는 프로세스 내부 잠금만 사용
+
+# ===[상태 저장소]==========================
+# 모든 봇의 data/*.json 읽기/쓰기를 여기로 모음
+# - 읽기: 파일마다 프로세스당 한 번 (이후에는 같은 dict 재사용)
+# - 쓰기: 임시 파일 -> fsync -> rename (중간에 죽어도 이전 파일은 그대로)
+# - 잠금: 같은 파일을 쓰는 다른 봇 프로세스와 겹치지 않도록 파일 잠금
+# - 봇끼리 같이 쓰는 파일(전송 대기열 outbox/, 중복 확인 dedup_data.json)은 DATA_DIR 아래
+#   한 번 실행 봇(scheduler 포함)은 저장소 data/, 데몬(ra_*)은 use_data_dir()로 자기 src/data/
+#   -> 데몬과 한 번 실행 봇을 같이 돌려도 서로의 대기열/전송 확인(refs)을 가져가지 않음
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "..", "data")
+# ==========================================
+
+_data = {}
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _thread_lock(path):
+    with _locks_guard:
+        return _locks.setdefault(path, threading.RLock())
+
+
+def use_data_dir(path):
+    """같이 쓰는 파일 폴더 바꾸기 (데몬 봇이 대기열/중복 확인을 처음 쓰기 전에 호출)"""
+    global DATA_DIR
+    DATA_DIR = path
+
+
+def data_path(*parts):
+    """같이 쓰는 파일 경로 (DATA_DIR 기준)"""
+    return os.path.join(DATA_DIR, *parts)
+
+
+@contextmanager
+def locked(path):
+    """파일 단위 잠금 (스레드 + 프로세스)"""
+    path = os.path.abspath(path)
+    with _thread_lock(path):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load(path):
+    """
+    데이터 파일 읽기 (최초 1회만 실제로 읽음)
+    파일이 없거나 깨져 있으면 빈 dict
+    """
+    path = os.path.abspath(path)
+    if path in _data:
+        return _data[path]
+
+    with locked(path):
+        data = _read(path)
+    _data[path] = data
+    return data
+
+
+def _read(path):
+    if not os.path.exists(path): return {}
+    with open(path, "r", encoding="utf-8") as f:
+        try: return json.load(f)
+        except Exception as e:
+            print(f"⚠ 데이터 파일 읽기 실패 ({os.path.basename(path)}): {e}")
+            return {}
+
+
+def _write(path, data):
+    """임시 파일 작성 후 교체 (잠금은 부르는 쪽에서)"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # 이름 바꾼 것까지 디스크에 반영 (리눅스)
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try: os.fsync(dir_fd)
+        finally: os.close(dir_fd)
+
+
+def save(path, data=None):
+    """원자적 저장 (같은 폴더에 임시 파일 작성 후 교체)"""
+    path = os.path.abspath(path)
+    if data is None:
+        data = _data.get(path, {})
+    _data[path] = data
+    with locked(path):
+        _write(path, data)
+
+
+def update(path, merge):
+    """
+    잠근 상태에서 파일을 다시 읽어 merge(파일 내용) 결과로 저장
+    (여러 프로세스가 같은 파일을 쓸 때 다른 쪽이 저장한 내용을 덮어쓰지 않도록)
+    """
+    path = os.path.abspath(path)
+    with locked(path):
+        data = merge(_read(path))
+        _write(path, data)
+    _data[path] = data
+    return data
@@ -0,0 +1,314 @@
+import os
+import json
+import time
+import uuid
+import tempfile
+import threading
+from collections import OrderedDict
+
+import state_store
+import http_client
+import message_packer
+
+# ===[설정 영역]==========================
+# 디스코드 전송 대기열
+# - 봇은 enqueue()로 넣기만 하고, 실행(주기) 끝에 flush()로 한꺼번에 전송
+# - 같은 웹후크로 가는 메시지는 디스코드 제한 안에서 최소 개수로 합쳐서 보냄 (message_packer)
+# - 보내기 전까지는 <데이터 폴더>/outbox/<웹후크 환경변수>.jsonl 에 남아 있어서
+#   중간에 죽어도 다음 실행 때 다시 전송 (파일에 URL은 저장하지 않음)
+#   데이터 폴더는 봇 상태 파일이 있는 곳 (state_store.DATA_DIR) -> 대기열에 넣은 봇만 그 refs를 받음
+# - 메시지마다 refs(어떤 글인지)를 같이 기록 -> flush()가 전송 확인된 refs를 돌려주면
+#   봇은 그때 본 글 목록/기준점을 갱신 (전송 실패한 글은 기록하지 않음)
+TIMEOUT = 10
+MAX_ATTEMPTS = 5      # 429/5xx 재시도 횟수
+# 메시지 자체가 잘못된 경우만 버림 (다시 보내도 똑같이 거부됨)
+REJECTED_STATUS = (400, 413)
+# 웹후크가 지워졌거나/토큰이 바뀐 경우 -> 버리지 않고 남겨두고 관리자에게 알림
+WEBHOOK_BROKEN_STATUS = (401, 403, 404)
+MONITOR_ENV = "MONITOR_WEBHOOK_URL"
+# ==========================================
+
+_buckets = {}         # 웹후크 URL -> 다시 보내도 되는 시각 (X-RateLimit-*)
+_global_reset = 0.0
+_outboxes = {}        # 환경변수 이름 -> OrderedDict(id -> {"payload", "refs"})
+_alerted = set()      # 관리자에게 이미 알린 웹후크 환경변수 (실행당 한 번)
+_lock = threading.RLock()
+
+
+# ===[세션]===
+def get_session(url):
+    """디스코드 호스트 공용 세션 (웹후크가 여러 개여도 연결 하나로 재사용, http_client)"""
+    return http_client.get_session(url)
+
+
+# ===[속도 제한]===
+def _wait_bucket(url):
+    wait = max(_buckets.get(url, 0.0), _global_reset) - time.time()
+    if wait > 0:
+        print(f"⏳ 디스코드 속도 제한 - {wait:.1f}초 대기")
+        time.sleep(wait)
+
+
+def _update_bucket(url, response):
+    """남은 횟수가 0이면 Reset-After 만큼 다음 전송을 미룸"""
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset_after = response.headers.get("X-RateLimit-Reset-After")
+    if remaining is None or reset_after is None: return
+    try:
+        if int(remaining) <= 0:
+            _buckets[url] = time.time() + float(reset_after)
+    except ValueError:
+        pass
+
+
+def _retry_after(response):
+    """429 응답의 대기 시간 (본문 retry_after 우선, 없으면 Retry-After 헤더)"""
+    global _global_reset
+    try: body = response.json()
+    except: body = {}
+    try: wait = float(body.get("retry_after") or response.headers.get("Retry-After") or 1)
+    except (TypeError, ValueError): wait = 1.0
+    if body.get("global") or response.headers.get("X-RateLimit-Global"):
+        _global_reset = time.time() + wait
+    return wait
+
+
+def _alert_broken(webhook_env, status):
+    """웹후크가 안 받아줄 때 관리자 알림 (관리자 웹후크 자체가 문제면 알리지 않음)"""
+    if not webhook_env or webhook_env in _alerted or webhook_env == MONITOR_ENV: return
+    _alerted.add(webhook_env)
+    monitor = os.environ.get(MONITOR_ENV)
+    if not monitor: return
+    content = (f"🚨 **[웹후크 오류]** `{webhook_env}` 전송 시 HTTP {status}\n"
+               f"> 웹후크가 삭제됐거나 주소가 바뀐 것 같음 - 메시지는 대기열에 남겨둠 (주소 고치면 다음 실행 때 전송)")
+    _deliver(monitor, {"content": content}, MONITOR_ENV)
+
+
+def _deliver(url, payload, webhook_env=None):
+    """
+    메시지 1개 전송 ({"content"} 또는 {"embeds"})
+    반환: True 성공 / False 실패 (대기열에 남겨두고 다음에 재시도) / None 메시지 거부됨 (재시도 의미 없음)
+    """
+    session = get_session(url)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        _wait_bucket(url)
+        try:
+            response = session.post(url, json=payload, timeout=TIMEOUT)
+        except Exception as e:
+            print(f"⚠ [전송 실패] {e}")
+            return False
+
+        _update_bucket(url, response)
+        if response.status_code < 300:
+            return True
+        if response.status_code == 429:
+            wait = _retry_after(response)
+            print(f"⏳ 429 - {wait:.1f}초 후 재시도 ({attempt}/{MAX_ATTEMPTS})")
+            time.sleep(wait)
+            continue
+        if response.status_code >= 500:
+            time.sleep(attempt)
+            continue
+        if response.status_code in REJECTED_STATUS:
+            print(f"⚠ [전송 거부] HTTP {response.status_code}: {response.text[:200]}")
+            return None
+        print(f"⚠ [전송 실패] HTTP {response.status_code} ({webhook_env or '웹후크'}) - 대기열에 남김")
+        if response.status_code in WEBHOOK_BROKEN_STATUS:
+            _alert_broken(webhook_env, response.status_code)
+        return False
+    return False
+
+
+# ===[메시지 합치기]===
+def _coalesce(items):
+    """
+    (id, payload) 목록을 디스코드 제한 안에서 합침 (message_packer.merge)
+    반환: [(이 메시지에 담긴 id 목록, payload), ...] - 먼저 들어온 순서
+    """
+    ids = [item_id for item_id, _ in items]
+    return [([ids[i] for i in indices], payload)
+            for indices, payload in message_packer.merge([payload for _, payload in items])]
+
+
+def _split_oversized(webhook_env, pending):
+    """
+    예전 형식/직접 넣은 긴 글(content 2000자 초과)은 조각마다 따로 대기열에 넣음
+    (조각별로 전송 확인 -> 중간에 실패해도 이미 보낸 조각은 다시 안 보냄)
+    refs는 마지막 조각에만 -> 전부 보내져야 본 글로 기록
+    """
+    oversized = [item_id for item_id, item in pending.items()
+                 if "content" in item["payload"]
+                 and message_packer.payload_size(item["payload"]) > message_packer.MAX_CONTENT]
+    if not oversized: return
+
+    records = []
+    rebuilt = OrderedDict()
+    for item_id, item in pending.items():
+        if item_id not in oversized:
+            rebuilt[item_id] = item
+            continue
+        parts = message_packer.split_text(item["payload"]["content"].strip("\n"))
+        for n, part in enumerate(parts, 1):
+            part_id = uuid.uuid4().hex
+            refs = item["refs"] if n == len(parts) else []
+            rebuilt[part_id] = {"payload": {"content": part}, "refs": refs}
+            records.append({"op": "add", "id": part_id, "payload": {"content": part}, "refs": refs})
+        records.append({"op": "ack", "id": item_id})
+    _append(webhook_env, records)
+    pending.clear()
+    pending.update(rebuilt)
+
+
+# ===[대기열 파일]===
+def _outbox_dir():
+    return state_store.data_path("outbox")
+
+
+def _outbox_file(webhook_env):
+    return os.path.join(_outbox_dir(), f"{webhook_env}.jsonl")
+
+
+def _read_outbox(webhook_env):
+    """파일의 add/ack 기록을 합쳐서 아직 ack 안 된 것만 (잠금은 부르는 쪽에서)"""
+    pending = OrderedDict()
+    path = _outbox_file(webhook_env)
+    if not os.path.exists(path): return pending
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try: record = json.loads(line)
+            except ValueError: continue  # 쓰다가 끊긴 마지막 줄
+            if record.get("op") == "add":
+                payload = record.get("payload") or {"content": record.get("content", "")}
+                pending[record["id"]] = {"payload": payload, "refs": record.get("refs", [])}
+            elif record.get("op") == "ack":
+                pending.pop(record["id"], None)
+    return pending
+
+
+def _outbox(webhook_env, refresh=False):
+    """
+    대기열 (처음 쓸 때 파일에서 읽음)
+    refresh: 파일을 다시 읽음 - 같은 대기열을 쓰는 다른 봇 프로세스(데몬/한 번 실행)가 넣은 것 반영
+    """
+    pending = _outboxes.get(webhook_env)
+    if pending is not None and not refresh:
+        return pending
+
+    with state_store.locked(_outbox_file(webhook_env)):
+        loaded = _read_outbox(webhook_env)
+    if pending is None:
+        pending = _outboxes[webhook_env] = OrderedDict()
+        if loaded:
+            print(f"✉ 미전송 메시지 {len(loaded)}건 발견 ({webhook_env})")
+    pending.clear()
+    pending.update(loaded)
+    return pending
+
+
+def _append(webhook_env, records):
+    path = _outbox_file(webhook_env)
+    os.makedirs(_outbox_dir(), exist_ok=True)
+    with state_store.locked(path):
+        with open(path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _compact(webhook_env):
+    """
+    ack 안 된 것만 남기고 파일 다시 쓰기 (다 보냈으면 빈 파일)
+    잠근 상태에서 파일을 다시 읽어서 씀 -> 그 사이 다른 프로세스가 넣은 메시지도 남음
+    """
+    path = _outbox_file(webhook_env)
+    if not os.path.exists(path): return
+    with state_store.locked(path):
+        remaining = _read_outbox(webhook_env)
+        fd, tmp_path = tempfile.mkstemp(dir=_outbox_dir(), prefix=".tmp_", suffix=".jsonl")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            for item_id, item in remaining.items():
+                record = {"op": "add", "id": item_id, "payload": item["payload"], "refs": item["refs"]}
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    pending = _outboxes.setdefault(webhook_env, OrderedDict())
+    pending.clear()
+    pending.update(remaining)
+
+
+# ===[진입점]===
+def enqueue(webhook_env, payload, refs=None):
+    """
+    전송 대기열에 추가 (디스크에 먼저 기록)
+    webhook_env: 웹후크 URL이 들어 있는 환경변수 이름 (예: "cse_WEBHOOK_URL")
+    payload: message_packer.build() 결과 메시지 (문자열이면 content로 취급)
+    refs: 이 메시지에 담긴 글 표시 (전송 확인 후 flush()가 돌려줌)
+    """
+    if not payload: return
+    if isinstance(payload, str):
+        payload = {"content": payload}
+    item_id = uuid.uuid4().hex
+    refs = list(refs or [])
+    with _lock:
+        pending = _outbox(webhook_env)
+        pending[item_id] = {"payload": payload, "refs": refs}
+        _append(webhook_env, [{"op": "add", "id": item_id, "payload": payload, "refs": refs}])
+        _split_oversized(webhook_env, pending)
+    return item_id
+
+
+def pending_refs(webhook_env):
+    """아직 전송 확인 안 된 글 (지난 실행에서 못 보낸 것 포함) -> 다시 넣지 않도록"""
+    with _lock:
+        return {ref for item in _outbox(webhook_env, refresh=True).values() for ref in item["refs"]}
+
+
+def flush(*webhook_envs):
+    """
+    대기 중인 메시지 전송 (인자 없으면 outbox 폴더의 모든 웹후크)
+    실패한 건 파일에 남겨두고 다음 flush 때 다시 보냄
+    반환: 전송 확인된 메시지들의 refs (거부돼서 버린 메시지 포함)
+    """
+    if not webhook_envs and os.path.isdir(_outbox_dir()):
+        webhook_envs = [name[:-len(".jsonl")] for name in os.listdir(_outbox_dir())
+                        if name.endswith(".jsonl") and not name.startswith(".")]
+
+    sent = 0
+    acked = []
+    with _lock:
+        for webhook_env in webhook_envs:
+            pending = _outbox(webhook_env, refresh=True)
+            if not pending: continue
+
+            url = os.environ.get(webhook_env)
+            if not url or "http" not in url:
+                print(f"⚠ 웹후크 URL이 없음 ({webhook_env}) - {len(pending)}건 보류")
+                continue
+
+            _split_oversized(webhook_env, pending)
+            items = [(item_id, item["payload"]) for item_id, item in pending.items()]
+            for ids, payload in _coalesce(items):
+                result = _deliver(url, payload, webhook_env)
+                if result is False:
+                    break  # 뒤 메시지는 순서 유지를 위해 다음에 같이 보냄
+                for item_id in ids:
+                    acked.extend(pending.pop(item_id)["refs"])
+                if result:
+                    sent += 1
+                _append(webhook_env, [{"op": "ack", "id": item_id} for item_id in ids])
+
+            _compact(webhook_env)
+            if pending:
+                print(f"⚠ [{webhook_env}] 미전송 {len(pending)}건 - 다음 실행 때 재전송")
+    if sent:
+        print(f"✉ [전송 완료] 디스코드 메시지 {sent}개")
+    return acked
+
+
+def send_now(url, content):
+    """대기열 없이 바로 전송 (관리자 알림용), 성공 여부 반환"""
+    if not url: return False
+    with _lock:
+        return all(_deliver(url, {"content": part}) for part in message_packer.split_text(content))
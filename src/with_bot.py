@@ -1,43 +1,38 @@
 import os
 import time
-import json
-import requests
 import re
 import traceback
 from datetime import datetime
-from dotenv import load_dotenv
-load_dotenv()
-import random
-import json as pyjson
-
-# ===[셀레니움 관련 라이브러리]===
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from selenium.webdriver.chrome.options import Options
+import env_loader
+env_loader.load()
+
+import state_store
+import webhook_queue
+import message_packer
+import with_list
+import chrome_driver
+import with_session
 
 # ===[설정 영역]==========================
 USER_ID = os.environ.get("CNU_ID")
 USER_PW = os.environ.get("CNU_PW")
-DISCORD_WEBHOOK_URL = os.environ.get("with_WEBHOOK_URL")
+WEBHOOK_ENV = "with_WEBHOOK_URL"
+DISCORD_WEBHOOK_URL = os.environ.get(WEBHOOK_ENV)
 MONITOR_WEBHOOK_URL = os.environ.get("MONITOR_WEBHOOK_URL")
 
-LIST_URL = "https://with.cnu.ac.kr/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmList.do"
+LIST_URL = with_list.LIST_URL
+# 목록 읽는 방법 - http: 로그인만 브라우저로 하고 목록은 HTTP로 (실패하면 브라우저로)
+#                 selenium: 예전처럼 목록도 브라우저로 넘기며 읽기
+FETCH_MODE = os.environ.get("WITH_FETCH_MODE", "http")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "..", "data", "with_data.json")
+# 기준점: 최근 확인한 글 번호(encSddpbSeq) 이만큼 + 처음 본 시각
+# 목록을 위에서부터 읽다가 이 중 하나라도 만나면 멈춤 (글 하나가 지워져도 전체를 다시 읽지 않음)
+WATERMARK_SIZE = 100
+# 밀린 글이 많으면 이 페이지까지 읽음
+MAX_PAGES = 10
 # ==========================================
 
-def clean_text(text):
-    if not text: return ""
-    return re.sub(r'\s+', ' ', text).strip()
-
 def parse_str_to_dt(date_str):
     if not date_str: return None
     try:
@@ -84,36 +79,58 @@ def calculate_multi_info(sub_items):
         result['capacity'] = f"{min(capacities)}명"
     return result
 
-def extract_details(container):
+def extract_details(block):
+    """목록에서 읽은 글(dict, with_list 모양)에서 신청/운영/정원 추출"""
     data = {"apply_raw": "", "oper_raw": "", "capacity": ""}
-    try:
-        for dl in container.find_elements(By.CSS_SELECTOR, ".etc_info_txt dl"):
-            dt = dl.find_element(By.TAG_NAME, "dt").get_attribute("textContent")
-            dd = dl.find_element(By.TAG_NAME, "dd").get_attribute("textContent")
-            if "신청" in dt: data["apply_raw"] = clean_text(dd)
-            elif "운영" in dt or "교육기간" in dt: data["oper_raw"] = clean_text(dd)
-    except: pass
-    try:
-        for dl in container.find_elements(By.CSS_SELECTOR, ".rq_desc dl"):
-            dt = dl.find_element(By.TAG_NAME, "dt").get_attribute("textContent")
-            if "모집" in dt or "정원" in dt:
-                data["capacity"] = clean_text(dl.find_element(By.TAG_NAME, "dd").get_attribute("textContent"))
-    except: pass
+    for dt, dd in block["etc"]:
+        if "신청" in dt: data["apply_raw"] = dd
+        elif "운영" in dt or "교육기간" in dt: data["oper_raw"] = dd
+    for dt, dd, _ in block["rq"]:
+        if "모집" in dt or "정원" in dt: data["capacity"] = dd
     return data
 
-def post_to_discord_safe(content):
+def new_item(pid, title, d_day, is_multi):
+    return {
+        "id": pid, "title": title, "d_day": d_day, "link": with_list.DETAIL_URL.format(pid),
+        "is_multi": is_multi, "sub_items": [], "multi_calc": {},
+        "apply_raw": "", "oper_raw": "", "capacity": ""
+    }
+
+def build_item(raw):
+    """목록에서 읽은 글(dict) -> 전송용 정보"""
+    p_data = new_item(raw["pid"], raw["title"], raw["d_day"], "multi_class" in raw["classes"])
+    if p_data["is_multi"]:
+        p_data['sub_items'] = [{"title": sub["title"], **extract_details(sub)} for sub in raw["subs"]]
+        # 세부 반이 안 보이면 글 자체 정보로 계산
+        p_data['multi_calc'] = calculate_multi_info(p_data['sub_items'] or [extract_details(raw)])
+    else:
+        p_data.update(extract_details(raw))
+    return p_data
+
+def post_to_discord_safe(payload, refs=None):
     if not DISCORD_WEBHOOK_URL or "http" not in DISCORD_WEBHOOK_URL: return
-    session = requests.Session()
-    retry = Retry(connect=3, backoff_factor=1)
-    session.mount('http://', HTTPAdapter(max_retries=retry))
-    session.mount('https://', HTTPAdapter(max_retries=retry))
-    try:
-        # 멘션 없이 내용만 전송
-        session.post(DISCORD_WEBHOOK_URL, json={"content": content}, timeout=10)
-        print("✉ [전송 성공]")
-    except Exception as e:
-        send_simple_error_log("게시물 전송 실패")
-        print(f"⚠ [전송 실패] {e}")
+    # 멘션 없이 내용만, flush_outbox()에서 전송
+    webhook_queue.enqueue(WEBHOOK_ENV, payload, refs)
+
+def flush_outbox(saved_data):
+    """대기열 전송 후 전송 확인된 글 번호만 기준점에 추가 (실패분은 다음 실행 때 재전송, 저장은 호출한 쪽에서)"""
+    mark_seen(saved_data, webhook_queue.flush(WEBHOOK_ENV))
+
+# ===[기준점]===
+def load_watermark(saved_data):
+    """기준점 목록 {글 번호: 처음 본 시각} (예전 last_read_id/sent_ids는 옮겨 담음)"""
+    legacy = [saved_data.pop("last_read_id", None)] + saved_data.pop("sent_ids", [])
+    mark_seen(saved_data, [pid for pid in legacy if pid])
+    return saved_data["watermark"]
+
+def mark_seen(saved_data, pids, now=None):
+    """기준점에 추가 (이미 있으면 처음 본 시각 유지, 최근 WATERMARK_SIZE개만 남김)"""
+    watermark = saved_data.setdefault("watermark", {})
+    now = int(now or time.time())
+    for pid in pids:
+        watermark.setdefault(pid, now)
+    if len(watermark) > WATERMARK_SIZE:
+        saved_data["watermark"] = dict(sorted(watermark.items(), key=lambda kv: kv[1])[-WATERMARK_SIZE:])
 
 # ===[메시지 디자인 수정 영역]===
 def create_message_content(info):
@@ -185,17 +202,13 @@ def send_batch_messages(new_items):
     
     count = len(new_items)
     # [메인 헤더]
-    full_message = f"### :compass: [CNU With+] 새로운 비교과 {count}건\n\n"
-    
-    for item in reversed(new_items):
-        content_chunk = create_message_content(item)
-        if len(full_message) + len(content_chunk) > 1900:
-            post_to_discord_safe(full_message)
-            full_message = ""
-        full_message += content_chunk
+    header = f"### :compass: [CNU With+] 새로운 비교과 {count}건\n\n"
+    items = list(reversed(new_items))
+    blocks = [create_message_content(item) for item in items]
 
-    if full_message:
-        post_to_discord_safe(full_message)
+    # 디스코드 제한에 맞춰 최소 개수의 메시지로 나눔
+    for payload, refs in message_packer.build(header, blocks, [item['id'] for item in items]):
+        post_to_discord_safe(payload, refs)
 
 def send_simple_error_log(error_msg=None):
     if not MONITOR_WEBHOOK_URL: return 
@@ -211,163 +224,178 @@ def send_simple_error_log(error_msg=None):
     else:
         content = f"🚨 **[WITH(비교과) 봇 오류]** \n{now}"
     
-    try:
-        requests.post(MONITOR_WEBHOOK_URL, json={"content": content}, timeout=5)
+    if webhook_queue.send_now(MONITOR_WEBHOOK_URL, content):
         print("✉ [관리자 알림 전송 완료]")
-    except:
+    else:
         print("⚠ 관리자 알림 전송 실패")
 
-def run_selenium_scraper():
-    print("\n" + "━" * 40)
-    print("🤖 WITH(비교과) 알람봇 실행")
+# ===[목록 읽기]===
+# HTTP/브라우저 모두 페이지마다 (페이지 번호, 글 목록(dict)) 을 내보냄
+def selenium_pages(driver):
+    try: with_list.open_list(driver)
+    except:
+        send_simple_error_log("목록 로딩 실패")
+        raise Exception("목록 로딩 실패")
+
+    for page in range(1, MAX_PAGES + 1):
+        if page > 1:
+            try: with_list.go_to_page(driver, page)
+            except: return
+
+        # 글 목록 전체를 스크립트 한 번으로 읽음
+        items = with_list.read_driver_page(driver)
+        if not items:
+            if page > 1: return  # 마지막 페이지를 넘어감
+            raise Exception(f"⚠ [{page}페이지] 게시글 목록(li)을 찾을 수 없음 (HTML 구조 변경 의심)")
+
+        yield page, items
+
+def scan_pages(pages, saved_data, pending):
+    """
+    위에서부터 읽다가 기준점(최근 확인한 글) 중 하나라도 만나면 멈춤 -> 읽는 페이지 수 = 새 글 양
+    최초 실행(기준점 없음)은 첫 페이지만 읽어서 기준점으로 씀
+    반환: (새 글 목록, 새 글은 아니지만 기준점에 넣을 글 번호)
+    """
+    watermark = saved_data.get("watermark", {})
+    is_first = not watermark
+    new_items, known, scanned = [], [], set()
+    for page, raws in pages:
+        pids = [raw["pid"] for raw in raws if raw["pid"]]
+        # 빈 페이지 / 같은 페이지 반복 = 마지막 페이지를 넘어감
+        if not pids or scanned.issuperset(pids): break
+        print(f"☐ [페이지 {page}] 스캔 중...")
+        for raw in raws:
+            pid = raw["pid"]
+            if not pid or pid in scanned: continue
+            scanned.add(pid)
+            if pid in watermark: return new_items, known
+            if is_first:
+                known.append(pid)
+                continue
+            # 대기열에 있는 글 (전송 전)
+            if pid in pending: continue
+            try: new_items.append(build_item(raw))
+            except: known.append(pid)
+        if is_first: break
+    return new_items, known
+
+def collect_items(saved_data, pending):
+    """
+    FETCH_MODE가 http면 목록을 HTTP로 읽음 (저장된 로그인 쿠키가 유효하면 브라우저를 띄우지 않음)
+    HTTP로 못 읽으면 브라우저로 다시 읽음
+    """
+    if FETCH_MODE == "http":
+        session = with_session.load()
+        if session is None:
+            session = with_session.save_from_driver(get_driver())
+        try:
+            return scan_pages(with_list.iter_pages(session, MAX_PAGES), saved_data, pending)
+        except Exception as e:
+            print(f"⚠ HTTP 목록 읽기 실패 -> 브라우저로 재시도: {e}")
+            with_session.clear()
+    return scan_pages(selenium_pages(get_driver()), saved_data, pending)
+
+# ===[브라우저]===
+# 로그인이 필요할 때만 띄움 (get_driver), 실행 끝에 quit_driver
+# 셀레니움 import도 이때 함 (저장된 세션으로 끝나는 실행은 셀레니움을 안 불러옴)
+_driver = None
+
+def login(driver):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    wait = WebDriverWait(driver, 20)
+    print(f"☐ 로그인 페이지 접속...")
+    driver.get("https://with.cnu.ac.kr/index.do")
+    
+    try:
+        login_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "login_btn")))
+        driver.execute_script("arguments[0].click();", login_btn)
+    except: pass
 
     try:
+        try:
+            wait.until(EC.visibility_of_element_located((By.NAME, "userId"))).send_keys(USER_ID)
+            driver.find_element(By.NAME, "password").send_keys(USER_PW + Keys.RETURN)
+        except:
+            found = False
+            for frame in driver.find_elements(By.TAG_NAME, "iframe"):
+                driver.switch_to.default_content()
+                driver.switch_to.frame(frame)
+                try:
+                    driver.find_element(By.NAME, "userId").send_keys(USER_ID)
+                    driver.find_element(By.NAME, "password").send_keys(USER_PW + Keys.RETURN)
+                    found = True
+                    driver.switch_to.default_content()
+                    break
+                except: continue
+            if not found: 
+                send_simple_error_log("로그인 폼 관련 오류")
+                raise Exception("로그인 폼 못 찾음")
+        
+        try:
+            wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "login_btn")))
+            print("☑ 로그인 성공")
+        except:
+            send_simple_error_log("로그인 실패")
+            raise Exception("⚠ 로그인 실패 (로그인 버튼이 사라지지 않음)")
+    except Exception as e: raise e
+
+def get_driver():
+    """로그인된 브라우저 (처음 부를 때 띄우고 로그인)"""
+    global _driver
+    if _driver is None:
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
+
         chrome_options = Options()
         chrome_options.add_argument("--headless")
         chrome_options.add_argument("--no-sandbox")
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--window-size=1920,1080")
         chrome_options.page_load_strategy = 'eager'
-
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        wait = WebDriverWait(driver, 20)
-
-        print(f"☐ 로그인 페이지 접속...")
-        driver.get("https://with.cnu.ac.kr/index.do")
-        
-        try:
-            login_btn = wait.until(EC.element_to_be_clickable((By.CLASS_NAME, "login_btn")))
-            driver.execute_script("arguments[0].click();", login_btn)
+        # 이미지/폰트 차단, 백그라운드 기능/캐시 끄기
+        chrome_driver.apply_scrape_profile(chrome_options)
+
+        # 드라이버 경로는 크롬 버전별로 캐시 (매번 버전 확인/다운로드 안 함)
+        service = chrome_driver.service()
+        _driver = webdriver.Chrome(service=service, options=chrome_options)
+        chrome_driver.block_resources(_driver)
+        login(_driver)
+    return _driver
+
+def quit_driver():
+    global _driver
+    if _driver is not None:
+        try: _driver.quit()
         except: pass
+    _driver = None
 
-        try:
-            try:
-                wait.until(EC.visibility_of_element_located((By.NAME, "userId"))).send_keys(USER_ID)
-                driver.find_element(By.NAME, "password").send_keys(USER_PW + Keys.RETURN)
-            except:
-                found = False
-                for frame in driver.find_elements(By.TAG_NAME, "iframe"):
-                    driver.switch_to.default_content()
-                    driver.switch_to.frame(frame)
-                    try:
-                        driver.find_element(By.NAME, "userId").send_keys(USER_ID)
-                        driver.find_element(By.NAME, "password").send_keys(USER_PW + Keys.RETURN)
-                        found = True
-                        driver.switch_to.default_content()
-                        break
-                    except: continue
-                if not found: 
-                    send_simple_error_log("로그인 폼 관련 오류")
-                    raise Exception("로그인 폼 못 찾음")
-            
-            try:
-                wait.until(EC.invisibility_of_element_located((By.CLASS_NAME, "login_btn")))
-                print("☑ 로그인 성공")
-            except:
-                send_simple_error_log("로그인 실패")
-                raise Exception("⚠ 로그인 실패 (로그인 버튼이 사라지지 않음)")
-        except Exception as e: raise e
-
-        last_read_id = None
-        is_first = False
-        if os.path.exists(DATA_FILE):
-            try:
-                with open(DATA_FILE, "r", encoding="utf-8") as f:
-                    last_read_id = json.load(f).get("last_read_id")
-            except: pass
-        if not last_read_id: is_first = True
-
-        driver.get(LIST_URL)
-        time.sleep(random.uniform(2, 4))
-        try: wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "li div.cont_box")))
-        except:
-            send_simple_error_log("목록 로딩 실패")
-            raise Exception("목록 로딩 실패")
-
-        new_items = []
-        stop = False
-        top_id = None
+def run_selenium_scraper():
+    print("\n" + "━" * 40)
+    print("🤖 WITH(비교과) 알람봇 실행")
 
-        for page in range(1, 4): 
-            if stop: break
-            print(f"☐ [페이지 {page}] 스캔 중...")
-            if page > 1:
-                try:
-                    driver.execute_script(f"global.page({page});")
-                    time.sleep(random.uniform(2, 4))
-                except: break
-            
-            items = driver.find_elements(By.CSS_SELECTOR, "li:has(div.cont_box)")
-            if not items: 
-                items = [li for li in driver.find_elements(By.CSS_SELECTOR, "li") if li.find_elements(By.CLASS_NAME, "cont_box")]
-            
-            if not items:
-                raise Exception(f"⚠ [{page}페이지] 게시글 목록(li)을 찾을 수 없음 (HTML 구조 변경 의심)")
+    saved_data = None
+    try:
+        saved_data = state_store.load(DATA_FILE)
+        is_first = not load_watermark(saved_data)
+        pending = webhook_queue.pending_refs(WEBHOOK_ENV)
+        new_items, known = collect_items(saved_data, pending)
+        mark_seen(saved_data, known)
 
-            for item in items:
-                try:
-                    a_tag = item.find_element(By.CSS_SELECTOR, "a.tit")
-                    pid = ""
-                    try:
-                        pid = pyjson.loads(a_tag.get_attribute("data-params")).get("encSddpbSeq")
-                    except: pass
-                    
-                    if not pid: continue
-                    if top_id is None: top_id = pid
-                    if pid == last_read_id:
-                        stop = True
-                        break
-                    if is_first: continue
-
-                    link = f"https://with.cnu.ac.kr/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmInfo.do?encSddpbSeq={pid}&paginationInfo.currentPageNo=1"
-                    full_title = a_tag.get_attribute("textContent")
-                    try: title = clean_text(full_title.replace(a_tag.find_element(By.CLASS_NAME, "label").get_attribute("textContent"), ""))
-                    except: title = clean_text(full_title)
-                    
-                    try: d_day = clean_text(item.find_element(By.CSS_SELECTOR, "span.day").get_attribute("textContent"))
-                    except: d_day = ""
-                    
-                    is_multi = "multi_class" in item.get_attribute("class")
-                    p_data = {
-                        "id": pid, "title": title, "d_day": d_day, "link": link,
-                        "is_multi": is_multi, "sub_items": [], "multi_calc": {},
-                        "apply_raw": "", "oper_raw": "", "capacity": ""
-                    }
-
-                    try:
-                        more = item.find_elements(By.CLASS_NAME, "class_more_open")
-                        if more and more[0].is_displayed():
-                            driver.execute_script("arguments[0].click();", more[0])
-                            time.sleep(0.5)
-                    except: pass
-
-                    if is_multi:
-                        for sub in item.find_elements(By.CLASS_NAME, "class_cont"):
-                            if not sub.get_attribute("textContent").strip(): continue
-                            try:
-                                s_title = sub.find_element(By.CSS_SELECTOR, "a.tit").get_attribute("textContent")
-                                try: s_title = s_title.replace(sub.find_element(By.CLASS_NAME, "label").get_attribute("textContent"), "")
-                                except: pass
-                                p_data['sub_items'].append({"title": clean_text(s_title), **extract_details(sub)})
-                            except: continue
-                        p_data['multi_calc'] = calculate_multi_info(p_data['sub_items'])
-                    else:
-                        p_data.update(extract_details(item))
-                    new_items.append(p_data)
-                except: continue
-        
         if is_first:
-            if top_id:
-                with open(DATA_FILE, "w", encoding="utf-8") as f: json.dump({"last_read_id": top_id}, f)
             print("☐ 최초 실행 - 기준점 설정 완료")
-        elif new_items:
-            print(f"● {len(new_items)}개 새 글 -> 묶음 전송")
-            send_batch_messages(new_items)
-            if top_id:
-                with open(DATA_FILE, "w", encoding="utf-8") as f: json.dump({"last_read_id": top_id}, f)
         else:
-            print("☒ 새 글 없음")
+            if new_items:
+                print(f"● {len(new_items)}개 새 글 -> 묶음 전송")
+                send_batch_messages(new_items)
+            else:
+                print("☒ 새 글 없음")
+            # 대기열에 못 넣은 글(웹후크 없음)은 바로 기준점에, 나머지는 전송 확인 후 추가
+            queued = webhook_queue.pending_refs(WEBHOOK_ENV)
+            mark_seen(saved_data, [item['id'] for item in new_items if item['id'] not in queued])
 
     except Exception as e:
         print(f"⚠ 에러: {e}")
@@ -375,7 +403,12 @@ def run_selenium_scraper():
         # 상세 에러 전송
         send_simple_error_log(f"프로그램 강제 종료\n{str(e)}")
     finally:
-        if 'driver' in locals(): driver.quit()
+        quit_driver()
+        # 에러로 중간에 끝났어도 쌓인 것 + 지난 실행에서 못 보낸 것 전송 후 한 번만 저장
+        if saved_data is None:
+            saved_data = state_store.load(DATA_FILE)
+        flush_outbox(saved_data)
+        state_store.save(DATA_FILE, saved_data)
 
 if __name__ == "__main__":
     run_selenium_scraper()
\ No newline at end of file
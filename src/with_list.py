@@ -0,0 +1,327 @@
+import re
+import json
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import rate_limiter
+import board_parser
+
+# lxml이 있으면 lxml, 없으면 BeautifulSoup (board_parser와 같은 선택)
+if board_parser.BACKEND == "lxml":
+    import lxml.html
+else:
+    from bs4 import BeautifulSoup
+
+# ===[설정 영역]==========================
+# WITH+ 비교과 목록을 브라우저 없이 HTTP로 가져오기
+# - 로그인은 셀레니움이 하고, 쿠키만 넘겨받은 requests 세션(with_session)으로 목록 페이지 요청
+# - global.page(n) 대신 페이지 번호를 파라미터로 넣어서 요청
+BASE_URL = "https://with.cnu.ac.kr"
+LIST_URL = BASE_URL + "/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmList.do"
+DETAIL_URL = BASE_URL + "/ptfol/imng/icmpNsbjtPgm/findIcmpNsbjtPgmInfo.do?encSddpbSeq={}&paginationInfo.currentPageNo=1"
+PAGE_PARAM = "paginationInfo.currentPageNo"
+TIMEOUT = 15
+# 2페이지부터는 이만큼씩 동시에 요청 (밀린 글이 많을 때만 뒤 페이지까지 감)
+PAGE_BATCH = 2
+
+# 브라우저로 읽을 때 고정 sleep 대신 조건 대기
+# - 목록이 나타날 때까지 / 첫 글이 바뀔 때까지 / DOM 변화가 SETTLE_QUIET초 동안 없을 때까지
+SETTLE_QUIET = 0.3
+SETTLE_TIMEOUT = 10
+# 페이지 넘길 때 최소로 쉬는 시간 (서버 예의상, (0, 0)이면 안 쉼)
+MIN_JITTER = (0.2, 0.8)
+# ==========================================
+
+# 목록의 글 하나는 파서와 상관없이 아래 모양의 dict로 정규화됨
+# {
+#     "pid": "encSddpbSeq 값",
+#     "title": "제목 (라벨 제외)", "d_day": "D-3", "classes": ["multi_class"],
+#     "etc": [["신청기간", "2024.01.01 ~ 2024.01.10"], ...],      # .etc_info_txt dl (dt, dd)
+#     "rq": [["모집인원", "30명", ["mileage"]], ...],               # .rq_desc dl (dt, dd, dl class)
+#     "subs": [{"title", "etc", "rq"}, ...]                         # 멀티 프로그램의 세부 반 (.class_cont)
+# }
+
+_LOGIN_BTN = re.compile(rb"""class=["'][^"']*\blogin_btn\b""")
+
+
+def clean_text(text):
+    if not text: return ""
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def parse_pid(data_params):
+    try: return json.loads(data_params).get("encSddpbSeq") or ""
+    except: return ""
+
+
+# ===[lxml]===
+def _cls(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _text_lxml(el):
+    return "".join(el.itertext()) if el is not None else ""
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _dls_lxml(el, box):
+    rows = []
+    for dl in el.xpath(f".//*[{_cls(box)}]//dl"):
+        dt, dd = _first(dl.xpath(".//dt")), _first(dl.xpath(".//dd"))
+        if dt is None or dd is None: continue
+        rows.append([clean_text(_text_lxml(dt)), clean_text(_text_lxml(dd)), (dl.get("class") or "").split()])
+    return rows
+
+
+def _title_lxml(el):
+    a = _first(el.xpath(f".//a[{_cls('tit')}]"))
+    if a is None: return None, ""
+    title = _text_lxml(a)
+    label = _first(a.xpath(f".//*[{_cls('label')}]"))
+    if label is not None:
+        title = title.replace(_text_lxml(label), "")
+    return a, clean_text(title)
+
+
+def _parse_lxml(content, encoding):
+    root = lxml.html.fromstring(content, parser=lxml.html.HTMLParser(encoding=encoding))
+    has_box = f".//div[{_cls('cont_box')}]"
+    items = []
+    # 세부 반(li)이 안에 또 있어도 바깥 li만
+    for li in root.xpath(f"//li[{has_box}][not(ancestor::li[{has_box}])]"):
+        a, title = _title_lxml(li)
+        if a is None: continue
+        day = _first(li.xpath(f".//span[{_cls('day')}]"))
+        subs = []
+        for sub in li.xpath(f".//*[{_cls('class_cont')}]"):
+            if not _text_lxml(sub).strip(): continue
+            sub_a, sub_title = _title_lxml(sub)
+            if sub_a is None: continue
+            subs.append({"title": sub_title, "etc": [r[:2] for r in _dls_lxml(sub, "etc_info_txt")],
+                         "rq": _dls_lxml(sub, "rq_desc")})
+        items.append({
+            "pid": parse_pid(a.get("data-params")),
+            "title": title,
+            "d_day": clean_text(_text_lxml(day)),
+            "classes": (li.get("class") or "").split(),
+            "etc": [r[:2] for r in _dls_lxml(li, "etc_info_txt")],
+            "rq": _dls_lxml(li, "rq_desc"),
+            "subs": subs,
+        })
+    return items
+
+
+# ===[BeautifulSoup]===
+def _dls_bs4(el, box):
+    rows = []
+    for dl in el.select(f".{box} dl"):
+        dt, dd = dl.find("dt"), dl.find("dd")
+        if dt is None or dd is None: continue
+        rows.append([clean_text(dt.get_text()), clean_text(dd.get_text()), dl.get("class", [])])
+    return rows
+
+
+def _title_bs4(el):
+    a = el.select_one("a.tit")
+    if a is None: return None, ""
+    title = a.get_text()
+    label = a.select_one(".label")
+    if label is not None:
+        title = title.replace(label.get_text(), "")
+    return a, clean_text(title)
+
+
+def _parse_bs4(content, encoding):
+    soup = BeautifulSoup(content, "html.parser", from_encoding=encoding)
+    boxed = [li for li in soup.find_all("li") if li.select_one("div.cont_box")]
+    outer = set(map(id, boxed))
+    items = []
+    for li in boxed:
+        if any(id(parent) in outer for parent in li.find_parents("li")): continue
+        a, title = _title_bs4(li)
+        if a is None: continue
+        day = li.select_one("span.day")
+        subs = []
+        for sub in li.select(".class_cont"):
+            if not sub.get_text().strip(): continue
+            sub_a, sub_title = _title_bs4(sub)
+            if sub_a is None: continue
+            subs.append({"title": sub_title, "etc": [r[:2] for r in _dls_bs4(sub, "etc_info_txt")],
+                         "rq": _dls_bs4(sub, "rq_desc")})
+        items.append({
+            "pid": parse_pid(a.get("data-params")),
+            "title": title,
+            "d_day": clean_text(day.get_text()) if day else "",
+            "classes": li.get("class", []),
+            "etc": [r[:2] for r in _dls_bs4(li, "etc_info_txt")],
+            "rq": _dls_bs4(li, "rq_desc"),
+            "subs": subs,
+        })
+    return items
+
+
+# ===[공통 진입점]===
+def parse_items(content, encoding="utf-8"):
+    """목록 페이지 HTML(바이트) -> 글 목록 (위 dict 모양)"""
+    if board_parser.BACKEND == "lxml":
+        return _parse_lxml(content, encoding)
+    return _parse_bs4(content, encoding)
+
+
+def is_logged_in(content):
+    """로그인 버튼이 보이면 세션 만료"""
+    return not _LOGIN_BTN.search(content)
+
+
+def fetch_page(session, page, required=True):
+    """
+    목록 한 페이지 가져와서 파싱 (로그인 풀렸으면 예외)
+    required: 글이 하나도 없으면 구조 변경으로 보고 예외 (False면 빈 목록 = 마지막 페이지 넘어감)
+    """
+    rate_limiter.wait_for(LIST_URL)
+    response = session.get(LIST_URL, params={PAGE_PARAM: page}, timeout=TIMEOUT)
+    response.raise_for_status()
+    if not is_logged_in(response.content):
+        raise Exception(f"[{page}페이지] 로그인 세션 만료")
+    items = parse_items(response.content)
+    if not items and required:
+        raise Exception(f"⚠ [{page}페이지] 게시글 목록(li)을 찾을 수 없음 (HTML 구조 변경 의심)")
+    return items
+
+
+def iter_pages(session, max_pages):
+    """
+    (페이지 번호, 글 목록)을 순서대로 내보냄 - 호출한 쪽이 멈추면 더 요청하지 않음
+    첫 페이지만 먼저 받고 (대부분 여기서 끝남), 더 읽어야 하면 PAGE_BATCH개씩 동시에 요청
+    """
+    yield 1, fetch_page(session, 1)
+
+    with ThreadPoolExecutor(max_workers=PAGE_BATCH) as pool:
+        for start in range(2, max_pages + 1, PAGE_BATCH):
+            pages = range(start, min(start + PAGE_BATCH, max_pages + 1))
+            futures = [(page, pool.submit(fetch_page, session, page, False)) for page in pages]
+            for page, future in futures:
+                yield page, future.result()
+
+
+# ===[브라우저]===
+# 셀레니움으로 읽을 때도 요소마다 find_element/get_attribute를 부르지 않고
+# 스크립트 한 번으로 위와 같은 모양의 dict 목록을 통째로 받음
+LIST_SELECTOR = "li div.cont_box"
+
+# DOM이 바뀔 때마다 시각 기록 (MutationObserver) -> 조용해지면 로딩 끝
+WATCH_JS = """
+if (!window.__withWatch) {
+    window.__withWatch = {last: Date.now()};
+    new MutationObserver(function () { window.__withWatch.last = Date.now(); })
+        .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+window.__withWatch.last = Date.now();
+"""
+QUIET_JS = "return window.__withWatch ? Date.now() - window.__withWatch.last : 1e9;"
+FIRST_PID_JS = """
+const a = document.querySelector("li div.cont_box a.tit, li a.tit");
+return a ? a.getAttribute("data-params") : null;
+"""
+
+EXPAND_JS = WATCH_JS + """
+let clicked = 0;
+document.querySelectorAll("li .class_more_open").forEach(function (button) {
+    if (button.offsetParent !== null) { button.click(); clicked++; }
+});
+return clicked;
+"""
+
+EXTRACT_JS = """
+const clean = t => (t || "").replace(/\\s+/g, " ").trim();
+const text = el => el ? el.textContent : "";
+const titleOf = el => {
+    const a = el.querySelector("a.tit");
+    if (!a) return null;
+    const label = a.querySelector(".label");
+    let title = text(a);
+    if (label && text(label)) title = title.split(text(label)).join("");
+    return {a: a, title: clean(title)};
+};
+const dls = (el, box) => Array.from(el.querySelectorAll("." + box + " dl")).map(dl => {
+    const dt = dl.querySelector("dt"), dd = dl.querySelector("dd");
+    return dt && dd ? [clean(text(dt)), clean(text(dd)), Array.from(dl.classList)] : null;
+}).filter(Boolean);
+const pidOf = a => {
+    try { return JSON.parse(a.getAttribute("data-params")).encSddpbSeq || ""; }
+    catch (e) { return ""; }
+};
+
+const boxed = Array.from(document.querySelectorAll("li")).filter(li => li.querySelector("div.cont_box"));
+return boxed.filter(li => !boxed.some(outer => outer !== li && outer.contains(li))).map(li => {
+    const head = titleOf(li);
+    if (!head) return null;
+    const subs = Array.from(li.querySelectorAll(".class_cont")).map(sub => {
+        if (!text(sub).trim()) return null;
+        const subHead = titleOf(sub);
+        if (!subHead) return null;
+        return {title: subHead.title, etc: dls(sub, "etc_info_txt").map(r => r.slice(0, 2)), rq: dls(sub, "rq_desc")};
+    }).filter(Boolean);
+    return {
+        pid: pidOf(head.a),
+        title: head.title,
+        d_day: clean(text(li.querySelector("span.day"))),
+        classes: Array.from(li.classList),
+        etc: dls(li, "etc_info_txt").map(r => r.slice(0, 2)),
+        rq: dls(li, "rq_desc"),
+        subs: subs
+    };
+}).filter(Boolean);
+"""
+
+
+def polite_pause():
+    if MIN_JITTER[1] > 0:
+        time.sleep(random.uniform(*MIN_JITTER))
+
+
+def wait_settled(driver, timeout=SETTLE_TIMEOUT):
+    """DOM 변화가 SETTLE_QUIET초 동안 없을 때까지 (최대 timeout초, 넘어도 그냥 진행)"""
+    from selenium.common.exceptions import TimeoutException, WebDriverException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    quiet_ms = SETTLE_QUIET * 1000
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.1, ignored_exceptions=(WebDriverException,)) \
+            .until(lambda d: d.execute_script(QUIET_JS) >= quiet_ms)
+    except TimeoutException: pass
+
+
+def open_list(driver, timeout=20):
+    """목록 첫 페이지 열기 (글 목록이 나타날 때까지 대기)"""
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+
+    driver.get(LIST_URL)
+    WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, LIST_SELECTOR)))
+    polite_pause()
+
+
+def go_to_page(driver, page, timeout=20):
+    """global.page(n) 호출 후 첫 글이 바뀌고 DOM이 조용해질 때까지 대기"""
+    from selenium.common.exceptions import WebDriverException
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    before = driver.execute_script(FIRST_PID_JS)
+    driver.execute_script(WATCH_JS + f"global.page({int(page)});")
+    WebDriverWait(driver, timeout, poll_frequency=0.1, ignored_exceptions=(WebDriverException,)) \
+        .until(lambda d: d.execute_script(FIRST_PID_JS) not in (None, before))
+    wait_settled(driver)
+    polite_pause()
+
+
+def read_driver_page(driver):
+    """현재 브라우저 페이지의 글 목록 (접힌 세부 반이 있으면 펼치고 DOM이 조용해진 뒤 읽음)"""
+    if driver.execute_script(EXPAND_JS):
+        wait_settled(driver, timeout=3)
+    return driver.execute_script(EXTRACT_JS) or []
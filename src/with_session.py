@@ -0,0 +1,88 @@
+import os
+import time
+
+import state_store
+import http_client
+import rate_limiter
+import with_list
+
+# ===[설정 영역]==========================
+# WITH+ 로그인 세션 재사용
+# - 셀레니움으로 로그인하면 쿠키(만료 시각 포함)를 저장
+# - 다음 실행 때는 저장된 쿠키로 가벼운 요청 1번(PROBE_URL)만 해서 로그인 유지 여부 확인
+# - 풀렸을 때만 브라우저를 띄워 다시 로그인 (SSO 로그인 횟수 줄이기)
+# - 로컬/서버(데몬)에서만 효과 있음: GitHub Actions는 쿠키를 캐시/커밋으로 넘기지 않으므로 실행마다 새로 로그인
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SESSION_FILE = os.path.join(BASE_DIR, "..", "data", "with_session.json")
+PROBE_URL = with_list.BASE_URL + "/index.do"
+# 만료 시각이 없는 쿠키(세션 쿠키)만 있어도 이 시간이 지나면 다시 로그인
+MAX_AGE = 24 * 3600
+# ==========================================
+
+# 세션 파일 모양 (쿠키가 들어 있으므로 저장소에 올리지 않음)
+# {"saved_at": 1700000000, "user_agent": "...", "cookies": [{"name", "value", "domain", "path", "expiry"}, ...]}
+
+
+def build_session(cookies, user_agent=None):
+    """with+ 호스트 공용 세션(http_client)에 저장된 쿠키/User-Agent 적용"""
+    session = http_client.get_session(with_list.BASE_URL)
+    session.cookies.clear()
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    session.headers["Referer"] = with_list.BASE_URL + "/index.do"
+    for cookie in cookies:
+        session.cookies.set(cookie["name"], cookie["value"],
+                            domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    return session
+
+
+def probe(session):
+    """로그인 유지 여부 (요청 1번)"""
+    try:
+        rate_limiter.wait_for(PROBE_URL)
+        response = session.get(PROBE_URL, timeout=with_list.TIMEOUT)
+        return response.status_code == 200 and with_list.is_logged_in(response.content)
+    except Exception as e:
+        print(f"⚠ 세션 확인 실패: {e}")
+        return False
+
+
+def load(now=None):
+    """저장된 쿠키가 아직 유효하면 그 쿠키를 쓰는 세션, 아니면 None"""
+    now = now or time.time()
+    data = state_store.load(SESSION_FILE)
+    if not data.get("cookies"): return None
+    if now - data.get("saved_at", 0) > MAX_AGE:
+        print("☐ 저장된 로그인 세션이 오래됨 -> 다시 로그인")
+        return None
+
+    cookies = [c for c in data["cookies"] if not c.get("expiry") or c["expiry"] > now]
+    if not cookies:
+        print("☐ 저장된 로그인 쿠키 만료 -> 다시 로그인")
+        return None
+
+    session = build_session(cookies, data.get("user_agent"))
+    if not probe(session):
+        print("☐ 저장된 로그인 세션이 풀림 -> 다시 로그인")
+        clear()
+        return None
+    print("☑ 저장된 로그인 세션 사용 (브라우저 로그인 생략)")
+    return session
+
+
+def save_from_driver(driver):
+    """로그인된 브라우저의 쿠키/User-Agent 저장 후 같은 쿠키를 쓰는 세션 반환"""
+    try: user_agent = driver.execute_script("return navigator.userAgent")
+    except: user_agent = None
+    cookies = [
+        {key: c[key] for key in ("name", "value", "domain", "path", "expiry") if key in c}
+        for c in driver.get_cookies()
+    ]
+    state_store.save(SESSION_FILE, {"saved_at": int(time.time()), "user_agent": user_agent, "cookies": cookies})
+    return build_session(cookies, user_agent)
+
+
+def clear():
+    """세션 파일 비우기 (다음 실행 때 다시 로그인)"""
+    if state_store.load(SESSION_FILE):
+        state_store.save(SESSION_FILE, {})